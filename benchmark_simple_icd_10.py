@@ -0,0 +1,246 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+# every measurement that involves loading the classification runs in a fresh interpreter, so that it isn't
+# affected by what was already imported or loaded by the previous ones
+
+_IMPORT_SCRIPT = """
+import time
+start = time.perf_counter()
+import simple_icd_10 as icd
+imported = time.perf_counter()
+icd.is_valid_item("C00")
+first_call = time.perf_counter()
+icd.is_valid_item("C00")
+second_call = time.perf_counter()
+print(imported-start, first_call-imported, second_call-first_call)
+"""
+
+_MEMORY_SCRIPT = """
+import gc
+import resource
+import sys
+import simple_icd_10 as icd
+objects = len(gc.get_objects())
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+icd.is_valid_item("C00")
+gc.collect()
+objects = len(gc.get_objects())-objects
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss-rss
+print(rss if sys.platform=="darwin" else rss*1024, objects)
+"""
+
+_DATABASE_SCRIPT = """
+import sys
+import time
+start = time.perf_counter()
+import simple_icd_10 as icd
+database = icd.CodeDatabase(sys.argv[1])
+database.get_description("C00")
+print(time.perf_counter()-start)
+"""
+
+
+# every result is printed and collected in _results, so that a run can be saved as JSON and compared with another
+# one (for example, of the previous release) with --compare
+_results = []
+
+def _report(name, value, unit):
+    _results.append({"name": name, "value": value, "unit": unit})
+    print("%-55s %14.3f %s" % (name, value, unit))
+
+def _run_in_fresh_interpreter(script, runs, *arguments):
+    results = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-W", "ignore", "-c", script, *arguments], capture_output=True, text=True, check=True).stdout
+        results.append([float(value) for value in output.split()])
+    return [statistics.median(column) for column in zip(*results)]
+
+def _best_of(function, repeat=5):
+    # the fastest of several runs, which is the least affected by the rest of the system
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter()-start)
+    return min(times)
+
+def bench_import(runs=10):
+    import_time, first_call, second_call = _run_in_fresh_interpreter(_IMPORT_SCRIPT, runs)
+    _report("import simple_icd_10", import_time*1000, "ms")
+    _report("first call (loads the data)", first_call*1000, "ms")
+    _report("second call", second_call*1000, "ms")
+
+def bench_memory(runs=5):
+    # resident memory added by loading the classification, and how many objects the garbage collector tracks
+    # (each of them gets its refcount written to, which breaks copy-on-write sharing after a fork)
+    rss, objects = _run_in_fresh_interpreter(_MEMORY_SCRIPT, runs)
+    _report("resident memory of the data", rss/2**20, "MB")
+    _report("gc-tracked objects", objects, "objects")
+
+def bench_database(runs=10):
+    # time until the first answer when the classification comes from a memory-mapped file instead of being loaded
+    import tempfile
+    import simple_icd_10 as icd
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "icd_10.bin")
+        icd.write_code_database(path)
+        first_answer, = _run_in_fresh_interpreter(_DATABASE_SCRIPT, runs, path)
+    _report("import and first answer from CodeDatabase", first_answer*1000, "ms")
+
+def _synthetic_codes(count, seed=0):
+    # a mix of valid codes in both formats, like the ones found in a claims file
+    import simple_icd_10 as icd
+    rng = random.Random(seed)
+    return rng.choices(icd.get_all_codes()+icd.get_all_codes(with_dots=False), k=count)
+
+def bench_validation(count=1_000_000):
+    # codes with and without the dot, 10% of which are misspelled
+    import simple_icd_10 as icd
+    rng = random.Random(0)
+    for with_dots in [True, False]:
+        codes = rng.choices(icd.get_all_codes(with_dots), k=count)
+        for i in range(0, count, 10):
+            codes[i] = codes[i]+"X"
+        elapsed = _best_of(lambda: [icd.is_valid_item(code) for code in codes], 3)
+        _report("is_valid_item, %s" % ("dotted" if with_dots else "undotted"), count/elapsed, "codes/s")
+
+def bench_hierarchy(runs=10):
+    # ancestors and descendants of the codes at the top of the tree, which have the most descendants, and of
+    # those at the bottom, which have the most ancestors
+    import simple_icd_10 as icd
+    chapters = [code for code in icd.get_all_codes() if icd.is_chapter(code)]
+    leaves = random.Random(0).sample([code for code in icd.get_all_codes() if icd.is_leaf(code)], 1000)
+    for name, codes in [("chapters", chapters), ("leaves", leaves)]:
+        for function in [icd.get_ancestors, icd.get_descendants]:
+            elapsed = _best_of(lambda: [function(code) for _ in range(runs) for code in codes])
+            _report("%s on %s" % (function.__name__, name), elapsed*1e6/len(codes)/runs, "us/call")
+
+def bench_nearest_common_ancestor(count=200_000):
+    import simple_icd_10 as icd
+    a_codes = _synthetic_codes(count, 1)
+    b_codes = _synthetic_codes(count, 2)
+    elapsed = _best_of(lambda: [icd.get_nearest_common_ancestor(a, b) for a, b in zip(a_codes, b_codes)], 3)
+    _report("get_nearest_common_ancestor", count/elapsed, "pairs/s")
+    elapsed = _best_of(lambda: icd.get_nearest_common_ancestor_batch(a_codes, b_codes), 3)
+    _report("get_nearest_common_ancestor_batch", count/elapsed, "pairs/s")
+
+def bench_all_codes(runs=100):
+    import simple_icd_10 as icd
+    for with_dots in [True, False]:
+        elapsed = _best_of(lambda: [icd.get_all_codes(with_dots) for _ in range(runs)])
+        _report("get_all_codes(with_dots=%s)" % with_dots, elapsed*1e6/runs, "us/call")
+    elapsed = _best_of(lambda: [icd.get_all_codes_view() for _ in range(runs)])
+    _report("get_all_codes_view()", elapsed*1e6/runs, "us/call")
+
+def bench_normalization(count=10_000_000):
+    import simple_icd_10 as icd
+    codes = _synthetic_codes(count)
+    for single, batch in [(icd.add_dot, icd.add_dot_batch), (icd.remove_dot, icd.remove_dot_batch)]:
+        elapsed = _best_of(lambda: [single(code) for code in codes], 1)
+        _report("%s on %d codes" % (single.__name__, count), count/elapsed, "codes/s")
+        elapsed = _best_of(lambda: batch(codes), 1)
+        _report("%s on %d codes" % (batch.__name__, count), count/elapsed, "codes/s")
+
+def bench_batch(count=1_000_000):
+    import simple_icd_10 as icd
+    codes = _synthetic_codes(count)
+    for single, batch in [(icd.is_valid_item, icd.is_valid_item_batch), (icd.get_description, icd.get_description_batch), (icd.get_parent, icd.get_parent_batch)]:
+        loop = _best_of(lambda: [single(code) for code in codes], 1)
+        elapsed = _best_of(lambda: batch(codes), 1)
+        _report("%s on %d codes" % (batch.__name__, count), count/elapsed, "codes/s")
+        _report("%s speedup over a loop" % batch.__name__, loop/elapsed, "x")
+
+def bench_search(runs=1000):
+    import simple_icd_10 as icd
+    start = time.perf_counter()
+    icd.search_descriptions("cholera")
+    _report("first search (builds the index)", (time.perf_counter()-start)*1000, "ms")
+    for query in ["asthma", "acute bronch", "malignant neoplasm of lip", "fracture of fem"]:
+        elapsed = _best_of(lambda: [icd.search_descriptions(query) for _ in range(runs)], 3)
+        _report('search "%s"' % query, elapsed*1000/runs, "ms/call")
+
+def bench_similarity(rows=1000, columns=10_000):
+    import simple_icd_10 as icd
+    a_codes = _synthetic_codes(rows, 1)
+    b_codes = _synthetic_codes(columns, 2)
+    for measure in ["path", "wu_palmer", "resnik"]:
+        elapsed = _best_of(lambda: sum(len(chunk) for chunk in icd.iter_similarity_matrix(a_codes, b_codes, measure)), 3)
+        _report("iter_similarity_matrix, %s" % measure, rows*columns/elapsed, "pairs/s")
+
+def bench_multi_hot(count=500_000):
+    # lists of 0 to 10 diagnoses for each patient
+    import simple_icd_10 as icd
+    rng = random.Random(0)
+    codes = _synthetic_codes(count*10)
+    code_lists = [codes[i:i+rng.randint(0, 10)] for i in range(0, len(codes), 10)]
+    for ancestors in [False, True]:
+        elapsed = _best_of(lambda: icd.encode_multi_hot(code_lists, ancestors), 3)
+        _report("encode_multi_hot(ancestors=%s)" % ancestors, len(code_lists)/elapsed, "rows/s")
+
+def bench_parallel(count=2_000_000):
+    # scaling of annotate_codes_parallel from one process to one for each core, against a loop in this process
+    import simple_icd_10 as icd
+    codes = _synthetic_codes(count)
+    elapsed = _best_of(lambda: [icd._get_annotation(code) for code in codes], 1)
+    _report("annotation loop on %d codes" % count, count/elapsed, "codes/s")
+    for processes in range(1, (os.cpu_count() or 1)+1):
+        elapsed = _best_of(lambda: icd.annotate_codes_parallel(codes, processes), 1)
+        _report("annotate_codes_parallel, %d processes" % processes, count/elapsed, "codes/s")
+
+_BENCHMARKS = {
+    "import": bench_import,
+    "memory": bench_memory,
+    "database": bench_database,
+    "validation": bench_validation,
+    "hierarchy": bench_hierarchy,
+    "nearest_common_ancestor": bench_nearest_common_ancestor,
+    "all_codes": bench_all_codes,
+    "normalization": bench_normalization,
+    "batch": bench_batch,
+    "search": bench_search,
+    "similarity": bench_similarity,
+    "multi_hot": bench_multi_hot,
+    "parallel": bench_parallel,
+}
+
+def _compare(path):
+    # prints the ratio between each result of this run and the one with the same name in a saved run
+    with open(path, encoding="utf-8") as file:
+        previous = {result["name"]: result for result in json.load(file)["results"]}
+    print("\ncompared with %s:" % path)
+    for result in _results:
+        old = previous.get(result["name"])
+        if old!=None and old["unit"]==result["unit"] and old["value"]:
+            print("%-55s %14.2fx %s" % (result["name"], result["value"]/old["value"], result["unit"]))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks of simple_icd_10.")
+    parser.add_argument("benchmarks", nargs="*", help="the benchmarks to run, among %s (by default, all of them)" % ", ".join(_BENCHMARKS))
+    parser.add_argument("--output", help="saves the results to this JSON file")
+    parser.add_argument("--compare", help="compares the results with the ones saved in this JSON file")
+    arguments = parser.parse_args()
+    for name in arguments.benchmarks:
+        if name not in _BENCHMARKS:
+            parser.error("unknown benchmark: %s" % name)
+    for name in arguments.benchmarks or list(_BENCHMARKS):
+        _BENCHMARKS[name]()
+    if arguments.output:
+        with open(arguments.output, "w", encoding="utf-8") as file:
+            json.dump({
+                "python": platform.python_version(),
+                "implementation": platform.python_implementation(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "results": _results,
+            }, file, indent=2)
+    if arguments.compare:
+        _compare(arguments.compare)
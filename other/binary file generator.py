@@ -0,0 +1,15 @@
+import simple_icd_10 as icd
+
+# run from the root of the repository after every change to the XML file: the snapshot stores the hash of the
+# XML file it was generated from, and the library ignores it (falling back to the XML) if the two don't match
+
+f = open("data/icd_10_v2019.xml", "rb")
+XML_input = f.read()
+f.close()
+
+snapshot = icd._build_snapshot(XML_input)
+
+for path in ["data/icd_10_v2019.bin", "package-files/simple_icd_10/data/icd_10_v2019.bin"]:
+    f = open(path, "wb")
+    f.write(snapshot)
+    f.close()
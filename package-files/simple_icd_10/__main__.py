@@ -0,0 +1,3 @@
+from .simple_icd_10 import _main
+
+_main()
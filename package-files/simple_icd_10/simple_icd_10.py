@@ -1,217 +1,1658 @@
 from __future__ import annotations
-import xml.etree.ElementTree as ET
-
-try:
-    import importlib.resources as pkg_resources
-except ImportError:
-    # Try backported to PY<37 `importlib_resources`.
-    import importlib_resources as pkg_resources  # type: ignore
+import bisect
+import functools
+import heapq
+import io
+import math
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+from collections import Counter, OrderedDict, deque
+from itertools import compress, islice, repeat
+from collections.abc import Iterator, Mapping, Sequence
 
 from . import data  # relative-import the "package" containing the data
 
-_chapter_list : list[_CodeTree] = []
+#the public API, which is what "from simple_icd_10 import *" (and so the package) exports
+__all__ = ["set_cache_size", "clear_cache", "get_cache_info", "Classification", "is_valid_item", "is_chapter",
+    "is_block", "is_category", "is_subcategory", "is_category_or_subcategory", "is_chapter_or_block",
+    "get_description", "get_parent", "get_children", "is_leaf", "get_ancestors", "get_descendants",
+    "get_descendants_view", "iter_descendants", "is_ancestor", "is_descendant", "get_nearest_common_ancestor",
+    "get_all_codes", "get_all_codes_view", "get_index", "remove_dot", "add_dot", "CodeInfo", "lookup", "try_lookup",
+    "compare_editions", "translate_codes", "is_valid_item_batch", "get_index_batch", "add_dot_batch",
+    "remove_dot_batch", "get_type_batch", "get_description_batch", "get_parent_batch", "is_descendant_batch",
+    "get_nearest_common_ancestor_batch", "get_distance_batch", "get_subtree_totals", "get_similarity_matrix",
+    "iter_similarity_matrix", "encode_multi_hot", "CodeSet", "warmup", "run_batch_async", "search_descriptions",
+    "get_codes_with_prefix", "get_codes_in_range", "suggest_codes", "suggest_codes_batch", "annotate_rows",
+    "annotate_file", "annotate_codes_parallel", "write_code_database", "CodeDatabase"]
 
-_code_to_node : dict[str,_CodeTree] = {}
+#the classification is stored as parallel arrays, with the codes in the order of a pre-order depth-first
+#traversal of the tree; each code is identified by its position in these arrays
+_names : list[str] = []
 
-_all_codes_list : list[str] = []
+_names_no_dots : list[str] = []
 
-_all_codes_list_no_dots : list[str] = []
+_descriptions : list[str] = []
 
-_code_to_index_dictionary : dict[str,int] = {}
+_types : bytes = b""
 
-class _CodeTree:
-    def __init__(self, tree, parent = None):
-        #initialize all the values
-        self.name = ""
-        self.description = ""
-        self.type = ""
-        self.parent = parent
-        self.children = []
-        
-        #reads the data from the subtrees
-        self.type=tree.attrib["type"]
-        for subtree in tree:
+_parents : array = array("i")
+
+#the children of the code in position i are _children[_children_offsets[i]:_children_offsets[i+1]]
+_children_offsets : array = array("i")
+
+_children : array = array("i")
+
+#maps both the format with the dot and the one without the dot of each code to its position
+_code_to_node : dict[str,int] = {}
+
+#the descendants of the code in position i are the codes in positions from i+1 to _subtree_ends[i]-1, so a is an
+#ancestor of b if and only if a<b<_subtree_ends[a]
+_subtree_ends : array = array("i")
+
+#the number of ancestors of each code
+_depths : bytes = b""
+
+#tuples of all the codes and of the codes of each type, in both formats, shared by all the calls to get_all_codes_view
+_all_codes_views : dict[tuple[bool,str|None],tuple[str,...]] = {}
+
+#the classification is loaded on the first call to a public function instead of on import
+_loaded : bool = False
+
+_load_lock = threading.Lock()
+
+_TYPES : tuple[str,...] = ("chapter","block","category","subcategory")
+
+_CHAPTER, _BLOCK, _CATEGORY, _SUBCATEGORY = range(4)
+
+#layout of the binary snapshot of the classification: magic, format version, sha256 of the XML file it was
+#generated from, number of codes; followed by the types (one byte each), the parent indices (int32, -1 for
+#chapters) and the utf-8 encoded names and descriptions, separated by newlines
+_SNAPSHOT_HEADER = struct.Struct("<8sI32sI")
+_SNAPSHOT_MAGIC = b"ICD10BIN"
+_SNAPSHOT_VERSION = 1
+
+def _read_data_file(name : str) -> bytes:
+    #importlib.resources and xml.etree are imported only when needed, to keep the import of the library cheap
+    try:
+        import importlib.resources as pkg_resources
+    except ImportError:
+        # Try backported to PY<37 `importlib_resources`.
+        import importlib_resources as pkg_resources  # type: ignore
+    return pkg_resources.read_binary(data, name)
+
+def _flatten_xml(xml : bytes) -> tuple[list[str],list[str],bytearray,array]:
+    import xml.etree.ElementTree as ET
+    #lists the items of the XML file in pre-order, each one with the index of its parent
+    names : list[str] = []
+    descriptions : list[str] = []
+    types = bytearray()
+    parents = array("i")
+    def visit(item, parent):
+        index = len(names)
+        names.append("")
+        descriptions.append("")
+        types.append(_TYPES.index(item.attrib["type"]))
+        parents.append(parent)
+        for subtree in item:
             if subtree.tag=="name":
-                self.name=subtree.text
+                names[index]=subtree.text
             elif subtree.tag=="description":
-                self.description=subtree.text
+                descriptions[index]=subtree.text
             else:
-                self.children.append(_CodeTree(subtree, parent=self))
-        
-        #adds the new node to the dictionary
-        _code_to_node[self.name]=self
+                visit(subtree, index)
+    for child in ET.fromstring(xml):
+        visit(child, -1)
+    return names, descriptions, types, parents
+
+def _build_snapshot(xml : bytes) -> bytes:
+    import hashlib
+    names, descriptions, types, parents = _flatten_xml(xml)
+    #the strings are stored separated by newlines, so they can't contain any
+    for string in names+descriptions:
+        if "\n" in string:
+            raise ValueError("The string \""+string+"\" contains a newline.")
+    if sys.byteorder=="big":
+        parents.byteswap()
+    header = _SNAPSHOT_HEADER.pack(_SNAPSHOT_MAGIC, _SNAPSHOT_VERSION, hashlib.sha256(xml).digest(), len(names))
+    return header + bytes(types) + parents.tobytes() + "\n".join(names+descriptions).encode("utf-8")
+
+def _read_snapshot(xml : bytes) -> tuple[list[str],list[str],bytes,array] | None:
+    #returns None if the snapshot is missing or wasn't generated from this exact XML file
+    import hashlib
+    try:
+        snapshot = _read_data_file('icd_10_v2019.bin')
+    except FileNotFoundError:
+        return None
+    if len(snapshot)<_SNAPSHOT_HEADER.size:
+        return None
+    magic, version, digest, count = _SNAPSHOT_HEADER.unpack_from(snapshot)
+    if magic!=_SNAPSHOT_MAGIC or version!=_SNAPSHOT_VERSION or digest!=hashlib.sha256(xml).digest():
+        return None
+    offset = _SNAPSHOT_HEADER.size
+    types = snapshot[offset:offset+count]
+    offset = offset+count
+    parents = array("i")
+    parents.frombytes(snapshot[offset:offset+4*count])
+    if sys.byteorder=="big":
+        parents.byteswap()
+    strings = snapshot[offset+4*count:].decode("utf-8").split("\n")
+    if len(parents)!=count or len(strings)!=2*count:
+        return None
+    return strings[:count], strings[count:], types, parents
+
+def _build_edition(names : list[str], descriptions : list[str], types, parents : array, code_to_node : dict[str,int] | None = None) -> tuple:
+    #computes the arrays of an edition from the output of _flatten_xml, filling code_to_node if it's given; the
+    #strings are interned, so that the editions loaded at the same time share the codes and descriptions they have
+    #in common
+    names = list(map(sys.intern, names))
+    descriptions = list(map(sys.intern, descriptions))
+    
+    #lists the children of each code, using the fact that they follow their parent in pre-order
+    offsets = array("i", bytes(4*(len(names)+1)))
+    for parent in parents:
+        if parent>=0:
+            offsets[parent+1] += 1
+    for i in range(len(names)):
+        offsets[i+1] += offsets[i]
+    children = array("i", bytes(4*offsets[len(names)]))
+    next_position = offsets[:len(names)]
+    for i in range(len(names)):
+        if parents[i]>=0:
+            children[next_position[parents[i]]] = i
+            next_position[parents[i]] += 1
+    depths = bytearray(len(names))
+    for i in range(len(names)):
+        if parents[i]>=0:
+            depths[i] = depths[parents[i]]+1
+    ends = array("i", range(1,len(names)+1))
+    for i in reversed(range(len(names))):
+        if parents[i]>=0 and ends[i]>ends[parents[i]]:
+            ends[parents[i]] = ends[i]
+    names_no_dots = []
+    for name in names:
+        if len(name)>4 and name[3]==".":
+            names_no_dots.append(sys.intern(name[:3]+name[4:]))
+        else:
+            names_no_dots.append(name)
+    #both formats of a code map to the same int object
+    nodes = list(range(len(names)))
+    if code_to_node==None:
+        code_to_node = {}
+    code_to_node.update(zip(names_no_dots, nodes))
+    code_to_node.update(zip(names, nodes))
+    return names, names_no_dots, descriptions, bytes(types), parents, offsets, children, ends, bytes(depths), code_to_node
 
 def _load_codes() -> None:
-    #creates the tree
-    root = ET.fromstring(pkg_resources.read_text(data, 'icd_10_v2019.xml'))
-    for child in root:
-        _chapter_list.append(_CodeTree(child))
-
-_load_codes()
-
-def _add_dot_to_code(code) -> str:
-    if len(code)<4 or code[3]==".":
-        return code
-    elif code[:3]+"."+code[3:] in _code_to_node:
-        return code[:3]+"."+code[3:]
+    global _loaded, _types, _parents, _children_offsets, _children, _subtree_ends, _depths
+    xml = _read_data_file('icd_10_v2019.xml')
+    flat = _read_snapshot(xml)
+    if flat==None:
+        flat = _flatten_xml(xml)
+    #the lists and the dictionary are filled in place, since some functions look them up before loading the data
+    names, names_no_dots, descriptions, _types, _parents, _children_offsets, _children, _subtree_ends, _depths, _ = _build_edition(*flat, _code_to_node)
+    _names[:] = names
+    _names_no_dots[:] = names_no_dots
+    _descriptions[:] = descriptions
+    for with_dots, codes in [(True, _names), (False, _names_no_dots)]:
+        _all_codes_views[(with_dots, None)] = tuple(codes)
+        for type in range(len(_TYPES)):
+            #translation table that turns the bytes in _types into 1 for this type and 0 for the others
+            is_of_type = bytes(type)+b"\1"+bytes(255-type)
+            _all_codes_views[(with_dots, _TYPES[type])] = tuple(compress(codes, _types.translate(is_of_type)))
+    _loaded = True
+
+def _ensure_loaded() -> None:
+    if not _loaded:
+        with _load_lock:
+            if not _loaded:
+                _load_codes()
+
+#optional cache for the results of get_children, get_ancestors, get_descendants and get_nearest_common_ancestor,
+#disabled by default; when it's enabled, these functions return tuples instead of lists
+
+_cache : _LRUCache | None = None
+
+class _LRUCache:
+    def __init__(self, maxsize : int):
+        self.maxsize = maxsize
+        self.entries : OrderedDict[tuple,object] = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, function, nodes : tuple[int,...]):
+        key = (function, nodes)
+        with self.lock:
+            if key in self.entries:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return self.entries[key]
+            self.misses += 1
+            result = function(*nodes)
+            if isinstance(result, list):
+                result = tuple(result)
+            self.entries[key] = result
+            if len(self.entries)>self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+            return result
+
+def _cached(function, *nodes):
+    cache = _cache
+    if cache==None:
+        return function(*nodes)
+    else:
+        return cache.get(function, nodes)
+
+def set_cache_size(maxsize) -> None:
+    global _cache
+    if maxsize<0:
+        raise ValueError("The size of the cache can't be negative.")
+    if maxsize==0:
+        _cache = None
     else:
-        return code
+        _cache = _LRUCache(maxsize)
+
+def clear_cache() -> None:
+    cache = _cache
+    if cache!=None:
+        with cache.lock:
+            cache.entries.clear()
+            cache.hits = 0
+            cache.misses = 0
+            cache.evictions = 0
+
+def get_cache_info() -> dict[str,int]:
+    cache = _cache
+    if cache==None:
+        return {"hits":0, "misses":0, "evictions":0, "size":0, "maxsize":0}
+    with cache.lock:
+        return {"hits":cache.hits, "misses":cache.misses, "evictions":cache.evictions, "size":len(cache.entries), "maxsize":cache.maxsize}
+
+#an edition of the classification, loaded from an XML file in the same format as the one included in the library;
+#the module-level functions are the methods of the default edition, returned by Classification(), whose arrays are
+#the ones used by the rest of the module
+
+class Classification:
+    def __new__(cls, path=None):
+        if path==None and _default_edition!=None:
+            return _default_edition
+        edition = super().__new__(cls)
+        edition._path = path
+        edition._loaded = False
+        edition._load_lock = threading.Lock()
+        return edition
+
+    def __repr__(self) -> str:
+        if self._path==None:
+            return "Classification()"
+        return "Classification("+repr(self._path)+")"
+
+    def _ensure_loaded(self) -> None:
+        #the edition is loaded on the first call to one of its methods
+        if not self._loaded:
+            with self._load_lock:
+                if not self._loaded:
+                    if self._path==None:
+                        _ensure_loaded()
+                        edition = (_names, _names_no_dots, _descriptions, _types, _parents, _children_offsets, _children, _subtree_ends, _depths, _code_to_node)
+                    else:
+                        with open(self._path, "rb") as file:
+                            edition = _build_edition(*_flatten_xml(file.read()))
+                    self._names, self._names_no_dots, self._descriptions, self._types, self._parents, self._children_offsets, self._children, self._subtree_ends, self._depths, self._code_to_node = edition
+                    self._loaded = True
+
+    #the methods find the node before reading the arrays, since they don't exist until the edition is loaded
+
+    def _get_node(self, code) -> int:
+        self._ensure_loaded()
+        if code not in self._code_to_node:
+            raise ValueError("The code \""+code+"\" does not exist.")
+        return self._code_to_node[code]
+
+    def _has_type(self, code, type) -> bool:
+        self._ensure_loaded()
+        return code in self._code_to_node and self._types[self._code_to_node[code]]==type
+
+    def is_valid_item(self, code) -> bool:
+        self._ensure_loaded()
+        return code in self._code_to_node
+
+    def is_chapter(self, code) -> bool:
+        return self._has_type(code, _CHAPTER)
+
+    def is_block(self, code) -> bool:
+        return self._has_type(code, _BLOCK)
+
+    def is_category(self, code) -> bool:
+        return self._has_type(code, _CATEGORY)
+
+    def is_subcategory(self, code) -> bool:
+        return self._has_type(code, _SUBCATEGORY)
+
+    def is_category_or_subcategory(self, code) -> bool:
+        return self.is_subcategory(code) or self.is_category(code)
+
+    def is_chapter_or_block(self, code) -> bool:
+        return self.is_block(code) or self.is_chapter(code)
+
+    def get_description(self, code) -> str:
+        node = self._get_node(code)
+        return self._descriptions[node]
+
+    def get_parent(self, code) -> str:
+        node = self._get_node(code)
+        parent = self._parents[node]
+        if parent>=0:
+            return self._names[parent]
+        else:
+            return ""
+
+    def get_children(self, code) -> list[str]:
+        node = self._get_node(code)
+        return _cached(self._get_children, node)
+
+    def _get_children(self, node) -> list[str]:
+        return [self._names[child] for child in self._children[self._children_offsets[node]:self._children_offsets[node+1]]]
+
+    def is_leaf(self, code) -> bool:
+        node = self._get_node(code)
+        return self._children_offsets[node]==self._children_offsets[node+1]
+
+    def get_ancestors(self, code) -> list[str]:
+        node = self._get_node(code)
+        return _cached(self._get_ancestors, node)
+
+    def _get_ancestors(self, node) -> list[str]:
+        result = []
+        while self._parents[node]>=0:
+            node = self._parents[node]
+            result.append(self._names[node])
+        return result
+
+    def get_descendants(self, code) -> list[str]:
+        node = self._get_node(code)
+        return _cached(self._get_descendants, node)
+
+    def _get_descendants(self, node) -> list[str]:
+        return self._names[node+1:self._subtree_ends[node]]
+
+    def is_ancestor(self, a, b) -> bool:
+        node_a = self._get_node(a)
+        return node_a<self._get_node(b)<self._subtree_ends[node_a]
+
+    def is_descendant(self, a, b) -> bool:
+        return self.is_ancestor(b, a)
+
+    def get_nearest_common_ancestor(self, a, b) -> str:
+        node_a = self._get_node(a)
+        return _cached(self._get_nearest_common_ancestor, node_a, self._get_node(b))
+
+    def _get_nearest_common_ancestor(self, a, b) -> str:
+        node = self._nearest_common_ancestor(a, b)
+        if node>=0:
+            return self._names[node]
+        else:
+            return ""
+
+    def _nearest_common_ancestor(self, a, b) -> int:
+        #climbs from the deeper of the two codes until reaching a code whose descendants include the other one
+        if self._depths[a]<self._depths[b]:
+            a, b = b, a
+        while a>=0 and not a<=b<self._subtree_ends[a]:
+            a = self._parents[a]
+        return a
+
+    def get_all_codes(self, with_dots=True) -> list[str]:
+        self._ensure_loaded()
+        if with_dots:
+            return self._names.copy()
+        else:
+            return self._names_no_dots.copy()
+
+    def get_index(self, code) -> int:
+        return self._get_node(code)
+
+    def remove_dot(self, code) -> str:
+        node = self._get_node(code)
+        return self._names_no_dots[node]
+
+    def add_dot(self, code) -> str:
+        node = self._get_node(code)
+        return self._names[node]
+
+#the edition used by the module-level functions, created once so that Classification() can always return it
+_default_edition : Classification | None = None
+_default_edition = Classification()
 
 def is_valid_item(code) -> bool:
-    return code in _code_to_node or len(code)>=4 and code[:3]+"."+code[3:] in _code_to_node
+    return _default_edition.is_valid_item(code)
 
 def is_chapter(code) -> bool:
-    code = _add_dot_to_code(code)
-    if code in _code_to_node:
-        return _code_to_node[code].type=="chapter"
-    else:
-        return False
+    return _default_edition.is_chapter(code)
 
 def is_block(code) -> bool:
-    code = _add_dot_to_code(code)
-    if code in _code_to_node:
-        return _code_to_node[code].type=="block"
-    else:
-        return False
+    return _default_edition.is_block(code)
 
 def is_category(code) -> bool:
-    code = _add_dot_to_code(code)
-    if code in _code_to_node:
-        return _code_to_node[code].type=="category"
-    else:
-        return False
+    return _default_edition.is_category(code)
 
 def is_subcategory(code) -> bool:
-    code = _add_dot_to_code(code)
-    if code in _code_to_node:
-        return _code_to_node[code].type=="subcategory"
-    else:
-        return False
-    
+    return _default_edition.is_subcategory(code)
+
 def is_category_or_subcategory(code) -> bool:
-    return is_subcategory(code) or is_category(code)
+    return _default_edition.is_category_or_subcategory(code)
 
 def is_chapter_or_block(code) -> bool:
-    return is_block(code) or is_chapter(code)
+    return _default_edition.is_chapter_or_block(code)
 
 def get_description(code) -> str:
-    if not is_valid_item(code):
-        raise ValueError("The code \""+code+"\" does not exist.")
-    node = _code_to_node[_add_dot_to_code(code)]
-    return node.description
+    return _default_edition.get_description(code)
 
 def get_parent(code) -> str:
-    if not is_valid_item(code):
-        raise ValueError("The code \""+code+"\" does not exist.")
-    node = _code_to_node[_add_dot_to_code(code)]
-    if node.parent!=None:
-        return node.parent.name
-    else:
-        return ""
+    return _default_edition.get_parent(code)
 
 def get_children(code) -> list[str]:
-    if not is_valid_item(code):
-        raise ValueError("The code \""+code+"\" does not exist.")
-    node = _code_to_node[_add_dot_to_code(code)]
-    res = []
-    for child in node.children:
-        res.append(child.name)
-    return res
+    return _default_edition.get_children(code)
 
 def is_leaf(code) -> bool:
-    if not is_valid_item(code):
-        raise ValueError("The code \""+code+"\" does not exist.")
-    node = _code_to_node[_add_dot_to_code(code)]
-    return len(node.children)==0
+    return _default_edition.is_leaf(code)
 
 def get_ancestors(code) -> list[str]:
+    return _default_edition.get_ancestors(code)
+
+def get_descendants(code) -> list[str]:
+    return _default_edition.get_descendants(code)
+
+def get_descendants_view(code) -> Sequence[str]:
+    _ensure_loaded()
     if not is_valid_item(code):
         raise ValueError("The code \""+code+"\" does not exist.")
-    node = _code_to_node[_add_dot_to_code(code)]
-    result = []
-    while node.parent != None:
-        result.append(node.parent.name)
-        node=node.parent
-    return result
+    node = _code_to_node[code]
+    return _CodeRange(range(node+1,_subtree_ends[node]), _names)
 
-def get_descendants(code) -> list[str]:
+def iter_descendants(code, breadth_first=False, max_depth=None) -> Iterator[str]:
+    _ensure_loaded()
     if not is_valid_item(code):
         raise ValueError("The code \""+code+"\" does not exist.")
-    node = _code_to_node[_add_dot_to_code(code)]
-    result = []
-    _add_children_to_list(node, result)
-    return result
+    if max_depth!=None and max_depth<0:
+        raise ValueError("The maximum depth can't be negative.")
+    node = _code_to_node[code]
+    if breadth_first:
+        return _iter_descendants_breadth_first(node, max_depth)
+    else:
+        return _iter_descendants_depth_first(node, max_depth)
+
+def _iter_descendants_depth_first(node, max_depth) -> Iterator[str]:
+    i = node+1
+    while i<_subtree_ends[node]:
+        if max_depth!=None and _depths[i]-_depths[node]>max_depth:
+            i = _subtree_ends[i] #skips i and its descendants, which are too deep
+        else:
+            yield _names[i]
+            i = i+1
+
+def _iter_descendants_breadth_first(node, max_depth) -> Iterator[str]:
+    queue = deque([node])
+    while queue:
+        parent = queue.popleft()
+        if max_depth!=None and _depths[parent]-_depths[node]>=max_depth:
+            continue
+        for child in _children[_children_offsets[parent]:_children_offsets[parent+1]]:
+            yield _names[child]
+            queue.append(child)
+
+class _CodeRange(Sequence):
+    #read-only view of the codes in a sequence of positions (a range or a memoryview of an array of positions), in
+    #one of the two formats, which doesn't copy them
+    __slots__ = ("_positions","_names")
+
+    def __init__(self, positions, names : list[str]):
+        self._positions = positions
+        self._names = names
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return _CodeRange(self._positions[index], self._names)
+        return self._names[self._positions[index]]
 
-def _add_children_to_list(node, list) -> None:
-    for child in node.children:
-        list.append(child.name)
-        _add_children_to_list(child,list)
+    def __iter__(self) -> Iterator[str]:
+        return map(self._names.__getitem__, self._positions)
+
+    def __contains__(self, code) -> bool:
+        return code in _code_to_node and self._names[_code_to_node[code]]==code and _code_to_node[code] in self._positions
+
+    def __repr__(self) -> str:
+        return repr(list(self))
 
 def is_ancestor(a,b) -> bool:
-    if not is_valid_item(a):
-        raise ValueError("The code \""+a+"\" does not exist.")
-    node = _code_to_node[_add_dot_to_code(a)]
-    return a in get_ancestors(b) and a!=b
+    return _default_edition.is_ancestor(a, b)
 
 def is_descendant(a,b) -> bool:
-    return is_ancestor(b,a)
+    return _default_edition.is_descendant(a, b)
 
 def get_nearest_common_ancestor(a,b) -> str:
-    anc_a = [_add_dot_to_code(a)] + get_ancestors(a)
-    anc_b = [_add_dot_to_code(b)] + get_ancestors(b)
-    if len(anc_b) > len(anc_a):
-        temp = anc_a
-        anc_a = anc_b
-        anc_b = temp
-    for anc in anc_a:
-        if anc in anc_b:
-            return anc
-    return ""
+    return _default_edition.get_nearest_common_ancestor(a, b)
 
 def get_all_codes(with_dots=True) -> list[str]:
-    if _all_codes_list==[]:
-        for chapter in _chapter_list:
-            _add_tree_to_list(chapter)
-    if with_dots:
-        return _all_codes_list.copy()
+    return _default_edition.get_all_codes(with_dots)
+
+def get_all_codes_view(with_dots=True, type=None) -> tuple[str,...]:
+    _ensure_loaded()
+    if (with_dots, type) not in _all_codes_views:
+        raise ValueError("The type \""+str(type)+"\" does not exist.")
+    return _all_codes_views[(with_dots, type)]
+
+def get_index(code) -> int:
+    return _default_edition.get_index(code)
+
+def remove_dot(code) -> str:
+    return _default_edition.remove_dot(code)
+
+def add_dot(code) -> str:
+    return _default_edition.add_dot(code)
+
+#handles that give access to all the information about a code, which is found only once
+
+class CodeInfo(tuple):
+    #a tuple that contains only the position of the code, which makes it immutable and cheap to create
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "CodeInfo("+repr(_names[self[0]])+")"
+
+    @property
+    def name(self) -> str:
+        return _names[self[0]]
+
+    @property
+    def name_no_dots(self) -> str:
+        return _names_no_dots[self[0]]
+
+    @property
+    def type(self) -> str:
+        return _TYPES[_types[self[0]]]
+
+    @property
+    def description(self) -> str:
+        return _descriptions[self[0]]
+
+    @property
+    def parent(self) -> str:
+        parent = _parents[self[0]]
+        if parent>=0:
+            return _names[parent]
+        else:
+            return ""
+
+    @property
+    def children(self) -> tuple[str,...]:
+        node = self[0]
+        return tuple(map(_names.__getitem__, _children[_children_offsets[node]:_children_offsets[node+1]]))
+
+    @property
+    def depth(self) -> int:
+        return _depths[self[0]]
+
+    @property
+    def is_leaf(self) -> bool:
+        node = self[0]
+        return _children_offsets[node]==_children_offsets[node+1]
+
+def lookup(code) -> CodeInfo:
+    _ensure_loaded()
+    node = _code_to_node.get(code, -1)
+    if node<0:
+        raise ValueError("The code \""+code+"\" does not exist.")
+    return CodeInfo((node,))
+
+def try_lookup(code) -> CodeInfo | None:
+    _ensure_loaded()
+    node = _code_to_node.get(code, -1)
+    if node<0:
+        return None
+    return CodeInfo((node,))
+
+#differences between two editions, and translation of codes from one to the other
+
+def _find_name(edition : Classification, name : str) -> int:
+    #returns the position of the code written exactly as name, or -1
+    node = edition._code_to_node.get(name, -1)
+    if node>=0 and edition._names[node]==name:
+        return node
+    return -1
+
+def compare_editions(old, new) -> dict[str,list]:
+    old._ensure_loaded()
+    new._ensure_loaded()
+    added = [name for name in new._names if _find_name(old, name)<0]
+    removed = []
+    moved = []
+    redescribed = []
+    for node, name in enumerate(old._names):
+        new_node = _find_name(new, name)
+        if new_node<0:
+            removed.append(name)
+            continue
+        old_parent = old._names[old._parents[node]] if old._parents[node]>=0 else ""
+        new_parent = new._names[new._parents[new_node]] if new._parents[new_node]>=0 else ""
+        if old_parent!=new_parent:
+            moved.append((name, old_parent, new_parent))
+        if old._descriptions[node]!=new._descriptions[new_node]:
+            redescribed.append((name, old._descriptions[node], new._descriptions[new_node]))
+    return {"added":added, "removed":removed, "moved":moved, "redescribed":redescribed}
+
+#the tables of the pairs of editions translated most recently; each one holds two entries for each code, so only a few are kept
+
+_TRANSLATION_TABLES_MAXSIZE = 16
+
+_translation_tables : OrderedDict[tuple[Classification,Classification],dict[str,str]] = OrderedDict()
+_translation_tables_lock = threading.Lock()
+
+def _get_translation_table(old : Classification, new : Classification) -> dict[str,str]:
+    key = (old, new)
+    with _translation_tables_lock:
+        if key not in _translation_tables:
+            _translation_tables[key] = _build_translation_table(old, new)
+            if len(_translation_tables)>_TRANSLATION_TABLES_MAXSIZE:
+                _translation_tables.popitem(last=False)
+        else:
+            _translation_tables.move_to_end(key)
+        return _translation_tables[key]
+
+def _build_translation_table(old : Classification, new : Classification) -> dict[str,str]:
+    #maps both formats of each code of the old edition to the same code in the new one or, if it was removed, to
+    #its nearest ancestor that still exists; the ancestors come first in pre-order, so they are already mapped
+    old._ensure_loaded()
+    new._ensure_loaded()
+    targets = array("i", bytes(4*len(old._names)))
+    for node, name in enumerate(old._names):
+        target = _find_name(new, name)
+        if target<0 and old._parents[node]>=0:
+            target = targets[old._parents[node]]
+        targets[node] = target
+    table = {}
+    for codes in [old._names_no_dots, old._names]:
+        for node, code in enumerate(codes):
+            table[code] = new._names[targets[node]] if targets[node]>=0 else ""
+    return table
+
+def translate_codes(codes, old, new) -> list[str]:
+    table = _get_translation_table(old, new)
+    return list(map(table.get, codes, repeat("")))
+
+#batch versions of the functions above: they take any iterable of codes (a list, a NumPy array, a pandas Series...)
+#and return a list with one result for each code, in the same order; instead of raising a ValueError, they return
+#an empty string (or -1 for get_index_batch) for the codes that don't exist
+
+def _map_distinct(function, codes) -> list:
+    #computes the result only once for each distinct code, then spreads the results over the whole input
+    codes = list(codes)
+    results = {code:function(code) for code in dict.fromkeys(codes)}
+    return list(map(results.__getitem__, codes))
+
+def is_valid_item_batch(codes) -> list[bool]:
+    _ensure_loaded()
+    return _map_distinct(lambda code: code in _code_to_node, codes)
+
+def get_index_batch(codes) -> list[int]:
+    _ensure_loaded()
+    return _map_distinct(lambda code: _code_to_node.get(code,-1), codes)
+
+def add_dot_batch(codes) -> list[str]:
+    _ensure_loaded()
+    return _map_distinct(lambda code: _names[_code_to_node[code]] if code in _code_to_node else "", codes)
+
+def remove_dot_batch(codes) -> list[str]:
+    _ensure_loaded()
+    return _map_distinct(lambda code: _names_no_dots[_code_to_node[code]] if code in _code_to_node else "", codes)
+
+def get_type_batch(codes) -> list[str]:
+    _ensure_loaded()
+    return _map_distinct(lambda code: _TYPES[_types[_code_to_node[code]]] if code in _code_to_node else "", codes)
+
+def get_description_batch(codes) -> list[str]:
+    _ensure_loaded()
+    return _map_distinct(lambda code: _descriptions[_code_to_node[code]] if code in _code_to_node else "", codes)
+
+def get_parent_batch(codes) -> list[str]:
+    _ensure_loaded()
+    return _map_distinct(lambda code: get_parent(code) if code in _code_to_node else "", codes)
+
+def is_descendant_batch(codes, b) -> list[bool]:
+    _ensure_loaded()
+    if not is_valid_item(b):
+        raise ValueError("The code \""+b+"\" does not exist.")
+    start = _code_to_node[b]
+    end = _subtree_ends[start]
+    return _map_distinct(lambda code: code in _code_to_node and start<_code_to_node[code]<end, codes)
+
+def _get_pair_nodes(a_codes, b_codes) -> list[tuple[int,int,int]]:
+    #for each pair of codes, their positions and the position of their nearest common ancestor (-1 if missing)
+    _default_edition._ensure_loaded()
+    a_codes, b_codes = list(a_codes), list(b_codes)
+    if len(a_codes)!=len(b_codes):
+        raise ValueError("The two lists of codes have different lengths.")
+    def resolve(pair):
+        if pair[0] in _code_to_node and pair[1] in _code_to_node:
+            a, b = _code_to_node[pair[0]], _code_to_node[pair[1]]
+            return a, b, _default_edition._nearest_common_ancestor(a, b)
+        else:
+            return -1, -1, -1
+    return _map_distinct(resolve, zip(a_codes, b_codes))
+
+def get_nearest_common_ancestor_batch(a_codes, b_codes) -> list[str]:
+    _ensure_loaded()
+    return [_names[ancestor] if ancestor>=0 else "" for _, _, ancestor in _get_pair_nodes(a_codes, b_codes)]
+
+def get_distance_batch(a_codes, b_codes) -> list[int]:
+    #like the similarity measures, the codes in different chapters are joined by a root above the chapters
+    _ensure_loaded()
+    return [_depths[a]+_depths[b]-2*_depths[ancestor] if ancestor>=0 else _depths[a]+_depths[b]+2 if a>=0 else -1 for a, b, ancestor in _get_pair_nodes(a_codes, b_codes)]
+
+#aggregation of counts or weights of codes over the hierarchy
+
+def get_subtree_totals(codes, weights=None, type=None) -> list:
+    _ensure_loaded()
+    if (True, type) not in _all_codes_views:
+        raise ValueError("The type \""+str(type)+"\" does not exist.")
+    if isinstance(codes, Mapping):
+        codes, weights = codes.keys(), codes.values()
+    elif weights is None: #not ==, since comparing an array or a Series to None gives an array
+        counts = Counter(codes)
+        codes, weights = counts.keys(), counts.values()
+    nodes = array("i", map(_code_to_node.get, codes, repeat(-1)))
+    weights = list(weights)
+    if len(nodes)!=len(weights):
+        raise ValueError("The codes and the weights have different lengths.")
+    #the last element collects the weights of the codes that don't exist (position -1), and is then dropped
+    totals = [0]*(len(_names)+1)
+    for node, weight in zip(nodes, weights):
+        totals[node] += weight
+    totals.pop()
+    #the descendants of a code follow it in pre-order, so going backwards each code is complete when it's added
+    #to its parent
+    for node in range(len(_names)-1, -1, -1):
+        if _parents[node]>=0:
+            totals[_parents[node]] += totals[node]
+    if type==None:
+        return totals
+    is_of_type = bytes(_TYPES.index(type))+b"\1"+bytes(255-_TYPES.index(type))
+    return list(compress(totals, _types.translate(is_of_type)))
+
+#similarity between codes, based on their nearest common ancestor; the classification is treated as having a
+#root above the chapters, so every pair of codes has a common ancestor
+
+_SIMILARITY_MEASURES : tuple[str,...] = ("path","wu_palmer","resnik")
+
+def _get_information_content(corpus) -> list[float]:
+    #-log of the probability of finding the code or one of its descendants in the corpus, where each code is also
+    #counted once so that codes missing from the corpus don't get an infinite value
+    totals = get_subtree_totals(corpus) if corpus is not None else [0]*len(_names) #the corpus can be an array or a Series
+    total = len(_names)+sum(totals[node] for node in range(len(_names)) if _parents[node]<0)
+    return [-math.log((totals[node]+_subtree_ends[node]-node)/total) for node in range(len(_names))]
+
+def _iter_similarity_rows(a_codes, b_codes, measure, corpus) -> Iterator[list[float]]:
+    #checks the arguments immediately, and returns a generator of the rows
+    _ensure_loaded()
+    if measure not in _SIMILARITY_MEASURES:
+        raise ValueError("The measure \""+str(measure)+"\" does not exist.")
+    a_nodes = [get_index(code) for code in a_codes]
+    b_nodes = [get_index(code) for code in b_codes]
+    information_content = _get_information_content(corpus) if measure=="resnik" else None
+    #the columns are sorted by depth and then by position: for each depth, the similarity with a row code only
+    #depends on which of its ancestors is the nearest common ancestor, and the columns that share the same one
+    #form at most two runs, found by bisection, around the descendants of the row code
+    order = sorted(range(len(b_nodes)), key=lambda i: (_depths[b_nodes[i]], b_nodes[i]))
+    inverse = [0]*len(order)
+    for rank, i in enumerate(order):
+        inverse[i] = rank
+    groups : dict[int,list[int]] = {}
+    for i in order:
+        groups.setdefault(_depths[b_nodes[i]], []).append(b_nodes[i])
+    return _generate_similarity_rows(a_nodes, groups, inverse, measure, information_content)
+
+def _generate_similarity_rows(a_nodes, groups, inverse, measure, information_content) -> Iterator[list[float]]:
+    for a in a_nodes:
+        chain = [a]
+        while _parents[chain[-1]]>=0:
+            chain.append(_parents[chain[-1]])
+        chain.reverse()
+        a_depth = len(chain)
+        row : list[float] = []
+        for b_depth, positions in groups.items():
+            b_depth += 1
+            #the values for the root and for each ancestor in the chain (those deeper than the column codes can't
+            #be common ancestors, so their runs are empty)
+            if measure=="path":
+                values = [1/(1+a_depth+b_depth-2*min(depth,b_depth)) for depth in range(a_depth+1)]
+            elif measure=="wu_palmer":
+                values = [2*depth/(a_depth+b_depth) for depth in range(a_depth+1)]
+            else:
+                values = [0.0]+[information_content[node] for node in chain]
+            starts = [0]+[bisect.bisect_left(positions, node) for node in chain]
+            ends = [len(positions)]+[bisect.bisect_left(positions, _subtree_ends[node]) for node in chain]
+            for depth in range(a_depth):
+                row += [values[depth]]*(starts[depth+1]-starts[depth])
+            row += [values[a_depth]]*(ends[a_depth]-starts[a_depth])
+            for depth in range(a_depth-1, -1, -1):
+                row += [values[depth]]*(ends[depth]-ends[depth+1])
+        yield list(map(row.__getitem__, inverse))
+
+def get_similarity_matrix(a_codes, b_codes, measure="wu_palmer", corpus=None) -> list[list[float]]:
+    return list(_iter_similarity_rows(a_codes, b_codes, measure, corpus))
+
+def iter_similarity_matrix(a_codes, b_codes, measure="wu_palmer", corpus=None, chunk_size=1000) -> Iterator[list[list[float]]]:
+    rows = _iter_similarity_rows(a_codes, b_codes, measure, corpus)
+    return iter(lambda: list(islice(rows, chunk_size)), [])
+
+#multi-hot encoding of lists of codes, as sparse matrices whose columns are the positions of the codes
+
+#for each combination of the arguments of encode_multi_hot, the columns set by each code, followed by those set by
+#the codes that don't exist (position -1), which are none
+_multi_hot_columns : dict[tuple[bool,int|None],list[tuple[int,...]]] = {}
+
+_multi_hot_columns_lock = threading.Lock()
+
+def _get_multi_hot_columns(ancestors : bool, max_depth : int | None) -> list[tuple[int,...]]:
+    key = (ancestors, max_depth)
+    if key not in _multi_hot_columns:
+        with _multi_hot_columns_lock:
+            if key not in _multi_hot_columns:
+                columns = []
+                for node in range(len(_names)):
+                    #the code and its ancestors, in increasing order of position (and so of depth)
+                    chain = [node]
+                    while _parents[chain[-1]]>=0:
+                        chain.append(_parents[chain[-1]])
+                    chain.reverse()
+                    if max_depth!=None:
+                        del chain[max_depth+1:]
+                    columns.append(tuple(chain) if ancestors else (chain[-1],))
+                columns.append(())
+                _multi_hot_columns[key] = columns
+    return _multi_hot_columns[key]
+
+def encode_multi_hot(code_lists, ancestors=False, max_depth=None) -> tuple[array,array]:
+    _ensure_loaded()
+    if max_depth!=None and max_depth<0:
+        raise ValueError("The maximum depth can't be negative.")
+    columns = _get_multi_hot_columns(ancestors, max_depth)
+    indptr = array("i", [0])
+    indices = array("i")
+    for codes in code_lists:
+        indices.extend(sorted(set().union(*map(columns.__getitem__, map(_code_to_node.get, codes, repeat(-1))))))
+        indptr.append(len(indices))
+    return indptr, indices
+
+#sets of codes stored as bitmaps over the positions of the codes: since the descendants of a code directly follow
+#it in pre-order, a code together with its descendants is a contiguous run of bits
+
+_CODE_SET_HEADER = struct.Struct("<8sII")
+_CODE_SET_MAGIC = b"ICD10SET"
+
+#turns the characters of a binary number into the bytes 0 and 1
+_BINARY_DIGITS = bytes(48)+b"\0\1"+bytes(206)
+
+_classification_checksum : int | None = None
+
+def _get_classification_checksum() -> int:
+    #identifies the classification that the positions in a serialized set refer to
+    global _classification_checksum
+    _ensure_loaded()
+    if _classification_checksum==None:
+        _classification_checksum = zlib.crc32("\n".join(_names).encode("utf-8"))
+    return _classification_checksum
+
+class CodeSet:
+    __slots__ = ("_bits","_flags")
+
+    def __init__(self, codes=(), descendants=True):
+        _ensure_loaded()
+        bits = 0
+        for code in codes:
+            if code not in _code_to_node:
+                raise ValueError("The code \""+code+"\" does not exist.")
+            node = _code_to_node[code]
+            end = _subtree_ends[node] if descendants else node+1
+            bits |= ((1<<(end-node))-1)<<node
+        self._bits = bits
+        self._flags : list[bool] | None = None
+
+    @classmethod
+    def _from_bits(cls, bits : int) -> CodeSet:
+        code_set = cls.__new__(cls)
+        code_set._bits = bits
+        code_set._flags = None
+        return code_set
+
+    def _get_flags(self) -> list[bool]:
+        #whether the code in each position is in the set, followed by a False that is read for the codes that
+        #don't exist (position -1)
+        if self._flags==None:
+            self._flags = list(map(bool, bin(self._bits)[:1:-1].ljust(len(_names)+1, "0").encode("ascii").translate(_BINARY_DIGITS)))
+        return self._flags
+
+    def __contains__(self, code) -> bool:
+        node = _code_to_node.get(code, -1)
+        return node>=0 and (self._bits>>node)&1==1
+
+    def contains_batch(self, codes) -> list[bool]:
+        flags = self._get_flags()
+        return list(map(flags.__getitem__, map(_code_to_node.get, codes, repeat(-1))))
+
+    def __len__(self) -> int:
+        return bin(self._bits).count("1")
+
+    def __iter__(self) -> Iterator[str]:
+        return compress(_names, self._get_flags())
+
+    def __repr__(self) -> str:
+        return "CodeSet("+repr(list(self))+")"
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, CodeSet) and self._bits==other._bits
+
+    def __hash__(self) -> int:
+        return hash(self._bits)
+
+    def union(self, other : CodeSet) -> CodeSet:
+        return CodeSet._from_bits(self._bits|other._bits)
+
+    def intersection(self, other : CodeSet) -> CodeSet:
+        return CodeSet._from_bits(self._bits&other._bits)
+
+    def difference(self, other : CodeSet) -> CodeSet:
+        return CodeSet._from_bits(self._bits&~other._bits)
+
+    def __or__(self, other) -> CodeSet:
+        if not isinstance(other, CodeSet):
+            return NotImplemented
+        return self.union(other)
+
+    def __and__(self, other) -> CodeSet:
+        if not isinstance(other, CodeSet):
+            return NotImplemented
+        return self.intersection(other)
+
+    def __sub__(self, other) -> CodeSet:
+        if not isinstance(other, CodeSet):
+            return NotImplemented
+        return self.difference(other)
+
+    def to_bytes(self) -> bytes:
+        header = _CODE_SET_HEADER.pack(_CODE_SET_MAGIC, len(_names), _get_classification_checksum())
+        return header+self._bits.to_bytes((len(_names)+7)//8, "little")
+
+    @classmethod
+    def from_bytes(cls, data : bytes) -> CodeSet:
+        _ensure_loaded()
+        if len(data)!=_CODE_SET_HEADER.size+(len(_names)+7)//8:
+            raise ValueError("The data doesn't contain a set of codes of this version of the classification.")
+        magic, count, checksum = _CODE_SET_HEADER.unpack_from(data)
+        if magic!=_CODE_SET_MAGIC or count!=len(_names) or checksum!=_get_classification_checksum():
+            raise ValueError("The data doesn't contain a set of codes of this version of the classification.")
+        bits = int.from_bytes(data[_CODE_SET_HEADER.size:], "little")
+        if bits>>len(_names)!=0:
+            #the padding bits after the last code must be 0
+            raise ValueError("The data doesn't contain a set of codes of this version of the classification.")
+        return cls._from_bits(bits)
+
+#explicit loading of everything that is otherwise loaded lazily, and running batch functions from asyncio code
+
+def warmup() -> None:
+    #loads the classification and builds the indices that are otherwise built on their first use, so that no later
+    #call has to wait for them; only the tables of encode_multi_hot with the default arguments are built, and the
+    #other editions and their translation tables are still loaded when they are used
+    _default_edition._ensure_loaded()
+    _get_search_index()
+    _get_sorted_index()
+    _get_correction_index()
+    _get_multi_hot_columns(False, None)
+
+async def run_batch_async(function, codes, *arguments, chunk_size=100000, executor=None) -> list:
+    #runs a batch function on chunks of the codes in an executor (by default, the one of the event loop), so
+    #that the event loop isn't blocked while they are processed (not even by loading the classification, which
+    #the first chunks do in the executor)
+    import asyncio
+    if chunk_size<1:
+        raise ValueError("The chunk size must be at least 1.")
+    loop = asyncio.get_running_loop()
+    codes = list(codes)
+    chunks = [codes[i:i+chunk_size] for i in range(0, len(codes), chunk_size)]
+    results = await asyncio.gather(*(loop.run_in_executor(executor, function, chunk, *arguments) for chunk in chunks))
+    return [result for chunk_results in results for result in chunk_results]
+
+#full-text search over the descriptions, with an inverted index that is built on the first search
+
+_search_index : _SearchIndex | None = None
+
+_search_index_lock = threading.Lock()
+
+class _SearchIndex:
+    #BM25 parameters
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        import re
+        self.word_pattern = re.compile(r"\w+")
+        #for each word, the BM25 weight of the word in the description of each code that contains it
+        self.postings : dict[str,dict[int,float]] = {}
+        #all the words, sorted, for prefix matching
+        self.words : list[str] = []
+        self.prefix_postings = functools.lru_cache(maxsize=1024)(self._get_prefix_postings)
+        self.ranked_matches = functools.lru_cache(maxsize=1024)(self._get_ranked_matches)
+        
+        descriptions = [self.tokenize(description) for description in _descriptions]
+        average_length = sum(len(words) for words in descriptions)/len(descriptions)
+        frequencies : dict[str,dict[int,int]] = {}
+        for node, words in enumerate(descriptions):
+            for word in words:
+                frequencies.setdefault(word, {})
+                frequencies[word][node] = frequencies[word].get(node,0)+1
+        for word, occurrences in frequencies.items():
+            idf = math.log((len(descriptions)-len(occurrences)+0.5)/(len(occurrences)+0.5)+1)
+            weights = {}
+            for node, frequency in occurrences.items():
+                length_norm = 1-self.B+self.B*len(descriptions[node])/average_length
+                weights[node] = idf*frequency*(self.K1+1)/(frequency+self.K1*length_norm)
+            self.postings[word] = weights
+        self.words = sorted(self.postings)
+
+    def tokenize(self, text : str) -> list[str]:
+        return self.word_pattern.findall(text.casefold())
+
+    def _get_prefix_postings(self, prefix : str) -> dict[int,float]:
+        #merges the postings of all the words that start with prefix, keeping for each code the best weight
+        merged : dict[int,float] = {}
+        for word in self.words[bisect.bisect_left(self.words, prefix):bisect.bisect_left(self.words, prefix+"\U0010ffff")]:
+            for node, weight in self.postings[word].items():
+                if weight>merged.get(node,0.0):
+                    merged[node] = weight
+        return merged
+
+    def _get_ranked_matches(self, word : str, prefix_match : bool) -> list[int]:
+        #the codes that match a query made of a single word, already sorted by relevance
+        if prefix_match:
+            weights = self.prefix_postings(word)
+        else:
+            weights = self.postings.get(word, {})
+        return sorted(weights, key=lambda node: (-weights[node], node))
+
+    def search(self, query : str, max_results : int, start : int, end : int, prefix_match : bool) -> list[int]:
+        #a code matches if its description contains all the words in the query (when prefix_match is True the
+        #last one may be incomplete), and the matches are ranked by the sum of the BM25 weights of the words
+        words = self.tokenize(query)
+        if words==[]:
+            return []
+        if len(words)==1:
+            matches = (node for node in self.ranked_matches(words[0], prefix_match) if start<=node<end)
+            return list(islice(matches, max_results))
+        postings = [self.postings.get(word, {}) for word in words[:-1]]
+        if prefix_match:
+            postings.append(self.prefix_postings(words[-1]))
+        else:
+            postings.append(self.postings.get(words[-1], {}))
+        postings.sort(key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+        if start>0 or end<len(_names):
+            candidates = [node for node in candidates if start<=node<end]
+        return heapq.nsmallest(max_results, candidates, key=lambda node: (-sum(weights[node] for weights in postings), node))
+
+def _get_search_index() -> _SearchIndex:
+    global _search_index
+    if _search_index==None:
+        with _search_index_lock:
+            if _search_index==None:
+                _search_index = _SearchIndex()
+    return _search_index
+
+def search_descriptions(query, max_results=10, within=None, prefix_match=True) -> list[str]:
+    _ensure_loaded()
+    if within==None:
+        start, end = 0, len(_names)
+    elif not is_valid_item(within):
+        raise ValueError("The code \""+within+"\" does not exist.")
     else:
-        return _all_codes_list_no_dots.copy()
+        start = _code_to_node[within]
+        end = _subtree_ends[start]
+    return [_names[node] for node in _get_search_index().search(query, max_results, start, end, prefix_match)]
+
+#sorted indices of the codes, for autocompletion and range queries, built on their first use
+
+_sorted_index : _SortedIndex | None = None
 
-def _add_tree_to_list(tree) -> None:
-    _all_codes_list.append(tree.name)
-    if(len(tree.name)>4 and tree.name[3]=="."):
-        _all_codes_list_no_dots.append(tree.name[:3]+tree.name[4:])
+_sorted_index_lock = threading.Lock()
+
+class _SortedIndex:
+    def __init__(self):
+        #all the codes in both formats, sorted, and their positions
+        pairs = sorted(set(zip(_names, range(len(_names)))) | set(zip(_names_no_dots, range(len(_names)))))
+        self.codes = [code for code, _ in pairs]
+        self.nodes = array("i", [node for _, node in pairs])
+        #the categories and subcategories sorted by their code with the dot, which sorts them as the codes without it
+        pairs = sorted((_names[node], node) for node in range(len(_names)) if _types[node]>=_CATEGORY)
+        self.categories = [code for code, _ in pairs]
+        self.category_nodes = array("i", [node for _, node in pairs])
+
+def _get_sorted_index() -> _SortedIndex:
+    global _sorted_index
+    if _sorted_index==None:
+        with _sorted_index_lock:
+            if _sorted_index==None:
+                _sorted_index = _SortedIndex()
+    return _sorted_index
+
+def get_codes_with_prefix(prefix, with_dots=True) -> list[str]:
+    _ensure_loaded()
+    index = _get_sorted_index()
+    start = bisect.bisect_left(index.codes, prefix)
+    end = bisect.bisect_left(index.codes, prefix+"\U0010ffff")
+    #a code can match in both formats, and the results are returned in the order of get_all_codes
+    nodes = sorted(set(index.nodes[start:end]))
+    if with_dots:
+        return [_names[node] for node in nodes]
     else:
-        _all_codes_list_no_dots.append(tree.name)
-    for child in tree.children:
-        _add_tree_to_list(child)
+        return [_names_no_dots[node] for node in nodes]
 
-def get_index(code) -> int: # type: ignore
-    if not is_valid_item(code):
-        raise ValueError("The code \""+code+"\" does not exist.")
-    code = _add_dot_to_code(code)
-    if _all_codes_list==[]:
-        for chapter in _chapter_list:
-            _add_tree_to_list(chapter)
-    if code in _code_to_index_dictionary:
-        return _code_to_index_dictionary[code]
+def get_codes_in_range(first, last, with_dots=True) -> Sequence[str]:
+    _ensure_loaded()
+    for code in [first, last]:
+        if not is_category_or_subcategory(code):
+            raise ValueError("The code \""+code+"\" is not a category or a subcategory.")
+    index = _get_sorted_index()
+    start = bisect.bisect_left(index.categories, add_dot(first))
+    #the subcategories of the last code are included
+    end = bisect.bisect_left(index.categories, add_dot(last)+"\U0010ffff")
+    if with_dots:
+        return _CodeRange(memoryview(index.category_nodes)[start:max(start,end)], _names)
     else:
-        i=0
-        for c in _all_codes_list:
-            if c==code:
-                _code_to_index_dictionary[code]=i
-                return i
-            else:
-                i=i+1
+        return _CodeRange(memoryview(index.category_nodes)[start:max(start,end)], _names_no_dots)
 
-def remove_dot(code) -> str:
-    if _all_codes_list==[]:
-        for chapter in _chapter_list:
-            _add_tree_to_list(chapter)
-    return _all_codes_list_no_dots[get_index(code)]
+#correction of misspelled codes, with an index of the codes that can be obtained by deleting characters from the
+#categories and subcategories (without the dot), built on the first use
 
-def add_dot(code) -> str:
-    if _all_codes_list==[]:
-        for chapter in _chapter_list:
-            _add_tree_to_list(chapter)
-    return _all_codes_list[get_index(code)]
\ No newline at end of file
+_correction_index : _CorrectionIndex | None = None
+
+_correction_index_lock = threading.Lock()
+
+#the first character of a category or subcategory is always a letter and the others are always digits, so
+#characters that are easily confused (by OCR or while typing) can be fixed depending on their position
+_TO_LETTER = str.maketrans("0158", "OISB")
+_TO_DIGIT = str.maketrans("OQDILSBZ", "00011582")
+
+class _CorrectionIndex:
+    MAX_DISTANCE = 2
+
+    def __init__(self):
+        #deletions[k] maps each string obtained by deleting exactly k characters from a code to the positions of
+        #those codes
+        self.deletions : list[dict[str,list[int]]] = [{} for _ in range(self.MAX_DISTANCE+1)]
+        for node in range(len(_names)):
+            if _types[node]>=_CATEGORY:
+                for k, variants in enumerate(self.get_deletions(_names_no_dots[node], self.MAX_DISTANCE)):
+                    for variant in variants:
+                        self.deletions[k].setdefault(variant, []).append(node)
+
+    def get_deletions(self, code : str, max_distance : int) -> list[set[str]]:
+        #the strings obtained by deleting exactly 0, 1, ..., max_distance characters from code
+        result = [{code}]
+        for _ in range(max_distance):
+            result.append({variant[:i]+variant[i+1:] for variant in result[-1] for i in range(len(variant))})
+        return result
+
+    def suggest(self, code : str, max_distance : int) -> list[tuple[int,int]]:
+        #a code within max_distance edits of the input can be turned into the same string as the input by deleting
+        #at most max_distance characters from both, so only those candidates need to be checked
+        candidates = set()
+        for variants in self.get_deletions(code, max_distance):
+            for deletions in self.deletions[:max_distance+1]:
+                for variant in variants:
+                    if variant in deletions:
+                        candidates.update(deletions[variant])
+        result = []
+        for node in candidates:
+            distance = _edit_distance(code, _names_no_dots[node], max_distance)
+            if distance<=max_distance:
+                result.append((distance, node))
+        result.sort()
+        return result
+
+def _get_correction_index() -> _CorrectionIndex:
+    global _correction_index
+    if _correction_index==None:
+        with _correction_index_lock:
+            if _correction_index==None:
+                _correction_index = _CorrectionIndex()
+    return _correction_index
+
+def _edit_distance(a : str, b : str, max_distance : int) -> int:
+    #Levenshtein distance in which swapping two adjacent characters also counts as a single edit; it stops as
+    #soon as the distance is known to be greater than max_distance
+    if abs(len(a)-len(b))>max_distance:
+        return max_distance+1
+    previous2 : list[int] = []
+    previous = list(range(len(b)+1))
+    for i in range(1, len(a)+1):
+        current = [i]+[0]*len(b)
+        for j in range(1, len(b)+1):
+            current[j] = min(previous[j]+1, current[j-1]+1, previous[j-1]+(a[i-1]!=b[j-1]))
+            if i>1 and j>1 and a[i-1]==b[j-2] and a[i-2]==b[j-1]:
+                current[j] = min(current[j], previous2[j-2]+1)
+        if min(current)>max_distance:
+            return max_distance+1
+        previous2, previous = previous, current
+    return previous[len(b)]
+
+def _clean_code(code : str) -> str:
+    #removes spaces, dots, commas used as dots and placeholder Xs at the end, converts to uppercase and fixes
+    #letters and digits that were swapped
+    code = "".join(code.split()).upper().replace(",", "").replace(".", "")
+    while len(code)>3 and code[-1]=="X":
+        code = code[:-1]
+    return code[:1].translate(_TO_LETTER)+code[1:].translate(_TO_DIGIT)
+
+def suggest_codes(code, max_distance=1, max_results=5) -> list[tuple[str,int]]:
+    _ensure_loaded()
+    if not 0<=max_distance<=_CorrectionIndex.MAX_DISTANCE:
+        raise ValueError("The maximum distance must be between 0 and "+str(_CorrectionIndex.MAX_DISTANCE)+".")
+    if not isinstance(code, str): #for example a missing value (NaN) in a pandas column
+        return []
+    simple_fix = "".join(code.split()).upper().replace(",", ".")
+    if simple_fix in _code_to_node:
+        return [(_names[_code_to_node[simple_fix]], 0)][:max_results]
+    cleaned = _clean_code(code)
+    if cleaned in _code_to_node:
+        return [(_names[_code_to_node[cleaned]], 0)][:max_results]
+    #the search with a larger distance is much slower, so it's done only if the closer codes aren't enough
+    suggestions = []
+    for distance in range(1, max_distance+1):
+        suggestions = _get_correction_index().suggest(cleaned, distance)
+        if len(suggestions)>=max_results:
+            break
+    return [(_names[node], distance) for distance, node in suggestions[:max_results]]
+
+def suggest_codes_batch(codes, max_distance=1, max_results=5) -> list[list[tuple[str,int]]]:
+    _ensure_loaded()
+    return _map_distinct(lambda code: suggest_codes(code, max_distance, max_results), codes)
+
+#annotation of large files of codes, for example claims, adding columns with the information about the codes
+
+_ANNOTATION_COLUMNS : tuple[str,...] = ("valid","code","description","chapter","block")
+
+def _get_annotation(code) -> tuple[bool,str,str,str,str]:
+    #whether the code is valid, its format with the dot, its description, its chapter and its innermost block
+    if not code in _code_to_node:
+        return False, "", "", "", ""
+    node = _code_to_node[code]
+    chapter = node
+    block = -1
+    while _parents[chapter]>=0:
+        if block<0 and _types[chapter]==_BLOCK:
+            block = chapter
+        chapter = _parents[chapter]
+    return True, _names[node], _descriptions[node], _names[chapter], _names[block] if block>=0 else ""
+
+def annotate_rows(rows, column, chunk_size=100000) -> Iterator[list]:
+    _ensure_loaded()
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk)>=chunk_size:
+            yield from _annotate_chunk(chunk, column)
+            chunk = []
+    yield from _annotate_chunk(chunk, column)
+
+def _annotate_chunk(chunk, column) -> Iterator[list]:
+    #the rows that are too short to have the column (like the blank lines of a CSV file) are left unannotated
+    annotations = iter(_map_distinct(_get_annotation, [row[column] for row in chunk if -len(row)<=column<len(row)]))
+    for row in chunk:
+        if -len(row)<=column<len(row):
+            yield list(row)+list(next(annotations))
+        else:
+            yield list(row)
+
+def _read_csv_chunks(file, chunk_size) -> Iterator[list[str]]:
+    #groups the lines of the file in chunks that end between two records: a line break belongs to a quoted field
+    #if an odd number of quotes precedes it
+    chunk : list[str] = []
+    quotes = 0
+    for line in file:
+        chunk.append(line)
+        quotes += line.count('"')
+        if len(chunk)>=chunk_size and quotes%2==0:
+            yield chunk
+            chunk = []
+            quotes = 0
+    if chunk!=[]:
+        yield chunk
+
+def _annotate_csv_chunk(lines, column, delimiter) -> tuple[str,int]:
+    #runs in the worker processes too, so it receives and returns text instead of parsed rows
+    import csv
+    output = io.StringIO()
+    rows = list(csv.reader(lines, delimiter=delimiter))
+    csv.writer(output, delimiter=delimiter, lineterminator="\n").writerows(annotate_rows(rows, column, len(rows)+1))
+    return output.getvalue(), len(rows)
+
+def _annotate_csv(input, output, column, delimiter, chunk_size, processes) -> int:
+    import csv
+    chunks = _read_csv_chunks(input, chunk_size)
+    header = next(csv.reader(next(_read_csv_chunks(input, 1), []), delimiter=delimiter), None)
+    if header==None:
+        return 0
+    if not column in header:
+        raise ValueError("The column \""+column+"\" does not exist.")
+    index = header.index(column)
+    csv.writer(output, delimiter=delimiter, lineterminator="\n").writerow(header+[column+"_"+name for name in _ANNOTATION_COLUMNS])
+    rows = 0
+    if processes<=1:
+        for chunk in chunks:
+            text, count = _annotate_csv_chunk(chunk, index, delimiter)
+            output.write(text)
+            rows += count
+        return rows
+    import concurrent.futures
+    #at most two chunks per process are read ahead, to keep the memory bounded
+    with concurrent.futures.ProcessPoolExecutor(processes) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_annotate_csv_chunk, chunk, index, delimiter))
+            if len(pending)>=2*processes:
+                text, count = pending.popleft().result()
+                output.write(text)
+                rows += count
+        while pending:
+            text, count = pending.popleft().result()
+            output.write(text)
+            rows += count
+    return rows
+
+def _annotate_parquet(input_path, output_path, column, chunk_size) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Annotating Parquet files requires the pyarrow package.")
+    input = pq.ParquetFile(input_path)
+    if not column in input.schema_arrow.names:
+        raise ValueError("The column \""+column+"\" does not exist.")
+    writer = None
+    rows = 0
+    try:
+        for batch in input.iter_batches(batch_size=chunk_size):
+            codes = [code if code!=None else "" for code in batch.column(column).to_pylist()]
+            annotations = list(zip(*_map_distinct(_get_annotation, codes)))
+            arrays = batch.columns+[pa.array(annotations[i] if annotations else [], type=pa.bool_() if i==0 else pa.string()) for i in range(len(_ANNOTATION_COLUMNS))]
+            names = batch.schema.names+[column+"_"+name for name in _ANNOTATION_COLUMNS]
+            annotated = pa.RecordBatch.from_arrays(arrays, names=names)
+            if writer==None:
+                writer = pq.ParquetWriter(output_path, annotated.schema)
+            writer.write_batch(annotated)
+            rows += batch.num_rows
+    finally:
+        if writer!=None:
+            writer.close()
+    return rows
+
+def annotate_file(input_path, output_path, column, delimiter=",", chunk_size=100000, processes=None) -> int:
+    _ensure_loaded()
+    if str(input_path).endswith(".parquet"):
+        return _annotate_parquet(input_path, output_path, column, chunk_size)
+    if processes==None:
+        #multiple processes are worth their start-up cost only for large files
+        large = input_path!="-" and os.path.getsize(input_path)>=64*2**20
+        processes = (os.cpu_count() or 1) if large else 1
+    input = sys.stdin if input_path=="-" else open(input_path, newline="", encoding="utf-8")
+    output = sys.stdout if output_path=="-" else open(output_path, "w", newline="", encoding="utf-8")
+    try:
+        return _annotate_csv(input, output, column, delimiter, chunk_size, processes)
+    finally:
+        if input is not sys.stdin:
+            input.close()
+        if output is not sys.stdout:
+            output.close()
+
+#flat encoding of the classification in a single read-only buffer, made of fixed-width records of int32 fields, the
+#children of all the codes, an open addressing hash table from both formats of each code to its position and a
+#heap with the utf-8 strings; it contains no Python objects, so when it's memory-mapped from a file it can be
+#shared by many processes without ever being copied
+
+_FLAT_HEADER = struct.Struct("=8sIIIII")
+_FLAT_MAGIC = b"ICD10MAP"
+_FLAT_VERSION = 1
+
+#the fields of each record: each string is stored as the positions of its first byte and of the byte after its end
+_FIELD_TYPE, _FIELD_PARENT, _FIELD_SUBTREE_END, _FIELD_CHILDREN_START, _FIELD_CHILDREN_END, _FIELD_NAME, _FIELD_NAME_END, _FIELD_NO_DOTS, _FIELD_NO_DOTS_END, _FIELD_DESCRIPTION, _FIELD_DESCRIPTION_END = range(11)
+_RECORD_FIELDS = 11
+
+def _build_flat_image() -> bytes:
+    heap = bytearray()
+    records = array("i")
+    for node in range(len(_names)):
+        records.extend([_types[node], _parents[node], _subtree_ends[node], _children_offsets[node], _children_offsets[node+1]])
+        for string in [_names[node], _names_no_dots[node], _descriptions[node]]:
+            records.append(len(heap))
+            heap.extend(string.encode("utf-8"))
+            records.append(len(heap))
+    #the table is at most half full, so the probe sequences are short
+    table_size = 1<<(2*len(_code_to_node)).bit_length()
+    table = array("i", [-1])*table_size
+    for code, node in _code_to_node.items():
+        slot = zlib.crc32(code.encode("utf-8")) & (table_size-1)
+        while table[slot]>=0:
+            slot = (slot+1) & (table_size-1)
+        table[slot] = node
+    header = _FLAT_HEADER.pack(_FLAT_MAGIC, _FLAT_VERSION, len(_names), len(_children), table_size, len(heap))
+    return header+records.tobytes()+_children.tobytes()+table.tobytes()+bytes(heap)
+
+class _FlatReader:
+    #reads the classification from a buffer created by _build_flat_image, without copying it
+    __slots__ = ("count","records","children","table","heap")
+
+    def __init__(self, buffer):
+        magic, version, self.count, children_count, table_size, heap_size = _FLAT_HEADER.unpack_from(buffer)
+        #the version is stored in native byte order, so it also doesn't match if the buffer comes from a machine
+        #with a different byte order
+        if magic!=_FLAT_MAGIC or version!=_FLAT_VERSION:
+            raise ValueError("The buffer doesn't contain a classification in a supported format.")
+        view = memoryview(buffer)
+        offset = _FLAT_HEADER.size
+        if len(view)!=offset+4*(_RECORD_FIELDS*self.count+children_count+table_size)+heap_size:
+            raise ValueError("The buffer doesn't contain a classification in a supported format.")
+        self.records = view[offset:offset+4*_RECORD_FIELDS*self.count].cast("i")
+        offset += 4*_RECORD_FIELDS*self.count
+        self.children = view[offset:offset+4*children_count].cast("i")
+        offset += 4*children_count
+        self.table = view[offset:offset+4*table_size].cast("i")
+        offset += 4*table_size
+        self.heap = view[offset:offset+heap_size]
+
+    def find(self, code) -> int:
+        #returns the position of the code, or -1 if it doesn't exist
+        if not isinstance(code, str):
+            return -1
+        key = code.encode("utf-8")
+        mask = len(self.table)-1
+        slot = zlib.crc32(key) & mask
+        while self.table[slot]>=0:
+            node = self.table[slot]
+            if self.get_bytes(node, _FIELD_NAME)==key or self.get_bytes(node, _FIELD_NO_DOTS)==key:
+                return node
+            slot = (slot+1) & mask
+        return -1
+
+    def get_field(self, node : int, field : int) -> int:
+        return self.records[node*_RECORD_FIELDS+field]
+
+    def get_bytes(self, node : int, field : int) -> memoryview:
+        return self.heap[self.records[node*_RECORD_FIELDS+field]:self.records[node*_RECORD_FIELDS+field+1]]
+
+    def get_string(self, node : int, field : int) -> str:
+        return str(self.get_bytes(node, field), "utf-8")
+
+    def get_annotation(self, code) -> tuple[bool,str,str,str,str]:
+        #same as _get_annotation
+        node = self.find(code)
+        if node<0:
+            return False, "", "", "", ""
+        chapter = node
+        block = -1
+        while self.get_field(chapter, _FIELD_PARENT)>=0:
+            if block<0 and self.get_field(chapter, _FIELD_TYPE)==_BLOCK:
+                block = chapter
+            chapter = self.get_field(chapter, _FIELD_PARENT)
+        return True, self.get_string(node, _FIELD_NAME), self.get_string(node, _FIELD_DESCRIPTION), self.get_string(chapter, _FIELD_NAME), self.get_string(block, _FIELD_NAME) if block>=0 else ""
+
+#the flat encoding attached by each worker process of annotate_codes_parallel
+_worker_reader : _FlatReader | None = None
+
+def _attach_worker(path) -> None:
+    global _worker_reader
+    with open(path, "rb") as file:
+        _worker_reader = _FlatReader(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+
+def _annotate_flat_chunk(codes) -> tuple[list[tuple[bool,str,str,str,str]],array]:
+    #returns the annotations of the distinct codes and, for each code, the position of its annotation, which are
+    #much cheaper to send back to the main process than an annotation for each code
+    distinct : dict[str,int] = {}
+    positions = array("i", [distinct.setdefault(code, len(distinct)) for code in codes])
+    return [_worker_reader.get_annotation(code) for code in distinct], positions
+
+def annotate_codes_parallel(codes, processes=None, chunk_size=100000) -> list[tuple[bool,str,str,str,str]]:
+    _ensure_loaded()
+    import concurrent.futures
+    import tempfile
+    codes = list(codes)
+    if processes==None:
+        processes = os.cpu_count() or 1
+    #the workers map the same file, so the operating system keeps a single copy of it in memory
+    descriptor, path = tempfile.mkstemp(prefix="simple_icd_10_", suffix=".bin")
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(_build_flat_image())
+        result : list[tuple[bool,str,str,str,str]] = []
+        with concurrent.futures.ProcessPoolExecutor(processes, initializer=_attach_worker, initargs=(path,)) as executor:
+            chunks = (codes[i:i+chunk_size] for i in range(0, len(codes), chunk_size))
+            for annotations, positions in executor.map(_annotate_flat_chunk, chunks):
+                result.extend(map(annotations.__getitem__, positions))
+        return result
+    finally:
+        os.remove(path)
+
+#the same flat encoding, saved to a file which is then memory-mapped: opening it doesn't load the classification,
+#and all the processes that open the same file share the pages of the operating system's cache
+
+def write_code_database(path) -> None:
+    _ensure_loaded()
+    with open(path, "wb") as file:
+        file.write(_build_flat_image())
+
+class CodeDatabase:
+    __slots__ = ("_file","_map","_reader")
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._reader = _FlatReader(self._map)
+        except BaseException:
+            self._file.close()
+            raise
+
+    def close(self) -> None:
+        #the views on the mapping have to be released before it can be closed
+        reader = self._reader
+        for view in [reader.records, reader.children, reader.table, reader.heap]:
+            view.release()
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    def _get_node(self, code) -> int:
+        node = self._reader.find(code)
+        if node<0:
+            raise ValueError("The code \""+code+"\" does not exist.")
+        return node
+
+    def _has_type(self, code, type) -> bool:
+        node = self._reader.find(code)
+        return node>=0 and self._reader.get_field(node, _FIELD_TYPE)==type
+
+    def is_valid_item(self, code) -> bool:
+        return self._reader.find(code)>=0
+
+    def is_chapter(self, code) -> bool:
+        return self._has_type(code, _CHAPTER)
+
+    def is_block(self, code) -> bool:
+        return self._has_type(code, _BLOCK)
+
+    def is_category(self, code) -> bool:
+        return self._has_type(code, _CATEGORY)
+
+    def is_subcategory(self, code) -> bool:
+        return self._has_type(code, _SUBCATEGORY)
+
+    def is_category_or_subcategory(self, code) -> bool:
+        return self.is_subcategory(code) or self.is_category(code)
+
+    def is_chapter_or_block(self, code) -> bool:
+        return self.is_block(code) or self.is_chapter(code)
+
+    def get_description(self, code) -> str:
+        return self._reader.get_string(self._get_node(code), _FIELD_DESCRIPTION)
+
+    def get_parent(self, code) -> str:
+        parent = self._reader.get_field(self._get_node(code), _FIELD_PARENT)
+        if parent>=0:
+            return self._reader.get_string(parent, _FIELD_NAME)
+        else:
+            return ""
+
+    def get_children(self, code) -> list[str]:
+        reader = self._reader
+        node = self._get_node(code)
+        children = reader.children[reader.get_field(node, _FIELD_CHILDREN_START):reader.get_field(node, _FIELD_CHILDREN_END)]
+        return [reader.get_string(child, _FIELD_NAME) for child in children]
+
+    def is_leaf(self, code) -> bool:
+        node = self._get_node(code)
+        return self._reader.get_field(node, _FIELD_CHILDREN_START)==self._reader.get_field(node, _FIELD_CHILDREN_END)
+
+def _main(arguments=None) -> None:
+    import argparse
+    parser = argparse.ArgumentParser(prog="python -m simple_icd_10", description="Adds to a CSV or Parquet file columns with the validity, the format with the dot, the description, the chapter and the block of the ICD-10 codes in one of its columns.")
+    parser.add_argument("input", help="the input file, or - for the standard input (CSV only)")
+    parser.add_argument("output", help="the output file, or - for the standard output (CSV only)")
+    parser.add_argument("-c", "--column", required=True, help="the name of the column that contains the codes")
+    parser.add_argument("-d", "--delimiter", default=",", help="the delimiter of the CSV file (default: ,)")
+    parser.add_argument("--chunk-size", type=int, default=100000, help="the number of rows read at a time (default: 100000)")
+    parser.add_argument("-p", "--processes", type=int, default=None, help="the number of processes (default: one per CPU for CSV files over 64 MB, otherwise one)")
+    arguments = parser.parse_args(arguments)
+    start = time.perf_counter()
+    try:
+        rows = annotate_file(arguments.input, arguments.output, arguments.column, arguments.delimiter, arguments.chunk_size, arguments.processes)
+    except (ValueError, ImportError, OSError) as error:
+        parser.exit(1, "error: "+str(error)+"\n")
+    elapsed = time.perf_counter()-start
+    print("Annotated "+str(rows)+" rows in "+format(elapsed, ".2f")+" seconds ("+format(rows/elapsed if elapsed>0 else 0, ".0f")+" rows/s).", file=sys.stderr)
+
+if __name__=="__main__":
+    _main()
\ No newline at end of file
@@ -1,6 +1,25 @@
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import threading
 import unittest
+import xml.etree.ElementTree as ET
 import simple_icd_10 as icd
 
+class _ArrayLike(list):
+    #compares elementwise like NumPy arrays and pandas Series, so using the result as a boolean raises an error
+    def __eq__(self, other):
+        return _Elementwise()
+
+    def __ne__(self, other):
+        return _Elementwise()
+
+class _Elementwise:
+    def __bool__(self):
+        raise ValueError("The truth value of an array with more than one element is ambiguous.")
+
 class TestSimpleICD10(unittest.TestCase):
 
     def test_is_valid_item(self):
@@ -75,6 +94,29 @@ class TestSimpleICD10(unittest.TestCase):
         self.assertEqual(icd.get_descendants("G10-G14"),['G10', 'G11', 'G11.0', 'G11.1', 'G11.2', 'G11.3', 'G11.4', 'G11.8', 'G11.9', 'G12', 'G12.0', 'G12.1', 'G12.2', 'G12.8', 'G12.9', 'G13', 'G13.0', 'G13.1', 'G13.2', 'G13.8', 'G14'])
         self.assertEqual(icd.get_descendants("C00"),['C00.0', 'C00.1', 'C00.2', 'C00.3', 'C00.4', 'C00.5', 'C00.6', 'C00.8', 'C00.9'])
         self.assertEqual(icd.get_descendants("H60.1"),[])
+
+    def test_get_descendants_view(self):
+        self.assertEqual(list(icd.get_descendants_view("G10-G14")),icd.get_descendants("G10-G14"))
+        self.assertEqual(list(icd.get_descendants_view("H60.1")),[])
+        self.assertEqual(len(icd.get_descendants_view("C00")),9)
+        self.assertEqual(icd.get_descendants_view("C00")[-1],"C00.9")
+        self.assertEqual(list(icd.get_descendants_view("C00")[2:4]),["C00.2","C00.3"])
+        self.assertTrue("C00.4" in icd.get_descendants_view("C00-C14"))
+        self.assertFalse("C00" in icd.get_descendants_view("C00"))
+        self.assertFalse("dinosaur" in icd.get_descendants_view("C00"))
+
+    def test_iter_descendants(self):
+        self.assertEqual(list(icd.iter_descendants("G10-G14")),icd.get_descendants("G10-G14"))
+        self.assertEqual(list(icd.iter_descendants("G10-G14",max_depth=1)),icd.get_children("G10-G14"))
+        self.assertEqual(list(icd.iter_descendants("G10-G14",breadth_first=True))[:7],['G10', 'G11', 'G12', 'G13', 'G14', 'G11.0', 'G11.1'])
+        self.assertEqual(list(icd.iter_descendants("VI",max_depth=2)),[code for code in icd.get_descendants("VI") if len(icd.get_ancestors(code))<=2])
+        self.assertEqual(sorted(icd.iter_descendants("VI",max_depth=2)),sorted(icd.iter_descendants("VI",breadth_first=True,max_depth=2)))
+        self.assertEqual(list(icd.iter_descendants("VI",max_depth=0)),[])
+        self.assertEqual(list(icd.iter_descendants("VI",breadth_first=True,max_depth=0)),[])
+        self.assertRaises(ValueError,icd.iter_descendants,"VI",max_depth=-1)
+        self.assertRaises(ValueError,icd.iter_descendants,"VI",True,-1)
+        self.assertEqual(list(icd.iter_descendants("H60.1")),[])
+        self.assertRaises(ValueError,icd.iter_descendants,"dinosaur")
         
     def test_is_descendant(self):
         self.assertTrue(icd.is_descendant("H60.1","H60-H62"))
@@ -86,9 +128,15 @@ class TestSimpleICD10(unittest.TestCase):
         self.assertTrue(icd.is_ancestor("H60-H62","H60.1"))
         self.assertFalse(icd.is_ancestor("E15-E16","E15-E16"))
         self.assertFalse(icd.is_ancestor("X60-X84","X85-Y09"))
+        self.assertTrue(icd.is_ancestor("H60","H601"))
+        self.assertFalse(icd.is_ancestor("H601","H60.1"))
         
     def test_get_nearest_common_ancestor(self):
         self.assertEqual(icd.get_nearest_common_ancestor("J950","J998"),"J95-J99")
+        self.assertEqual(icd.get_nearest_common_ancestor("H28.0","H25.1"),"H25-H28")
+        self.assertEqual(icd.get_nearest_common_ancestor("K35","E21.0"),"")
+        self.assertEqual(icd.get_nearest_common_ancestor("H601","H60"),"H60")
+        self.assertEqual(icd.get_nearest_common_ancestor("H601","H60.1"),"H60.1")
         
     def test_is_leaf(self):
         self.assertFalse(icd.is_leaf("XII"))
@@ -104,6 +152,16 @@ class TestSimpleICD10(unittest.TestCase):
         self.assertEqual(icd.get_all_codes()[7159],'P00')
         self.assertEqual(icd.get_description(icd.get_all_codes()[7159]),'Fetus and newborn affected by maternal conditions that may be unrelated to present pregnancy')
         
+    def test_get_all_codes_view(self):
+        self.assertEqual(icd.get_all_codes_view(),tuple(icd.get_all_codes()))
+        self.assertEqual(icd.get_all_codes_view(False),tuple(icd.get_all_codes(False)))
+        self.assertIs(icd.get_all_codes_view(),icd.get_all_codes_view())
+        self.assertEqual(icd.get_all_codes_view(type="chapter")[:3],("I","II","III"))
+        self.assertEqual(icd.get_all_codes_view(False,"subcategory")[:3],("A000","A001","A009"))
+        for type in ["chapter","block","category","subcategory"]:
+            self.assertEqual(icd.get_all_codes_view(type=type),tuple(code for code in icd.get_all_codes() if icd.get_type_batch([code])[0]==type))
+        self.assertRaises(ValueError,icd.get_all_codes_view,True,"dinosaur")
+
     def test_get_index(self):
         self.assertEqual(icd.get_index("P00"),7159)
     
@@ -117,4 +175,358 @@ class TestSimpleICD10(unittest.TestCase):
         self.assertEqual(icd.add_dot("XII"),"XII")
         self.assertEqual(icd.add_dot("G10-G14"),"G10-G14")
         self.assertEqual(icd.add_dot("H60.1"),"H60.1")
-        self.assertEqual(icd.add_dot("H601"),"H60.1")
\ No newline at end of file
+        self.assertEqual(icd.add_dot("H601"),"H60.1")
+
+    def test_lookup(self):
+        for code in ["XII","L80-L99","H60","H60.1","H601"]:
+            info = icd.lookup(code)
+            self.assertEqual(info.name,icd.add_dot(code))
+            self.assertEqual(info.name_no_dots,icd.remove_dot(code))
+            self.assertTrue(getattr(icd,"is_"+info.type)(code))
+            self.assertEqual(info.description,icd.get_description(code))
+            self.assertEqual(info.parent,icd.get_parent(code))
+            self.assertEqual(info.children,tuple(icd.get_children(code)))
+            self.assertEqual(info.depth,len(icd.get_ancestors(code)))
+            self.assertEqual(info.is_leaf,icd.is_leaf(code))
+            self.assertEqual(icd.try_lookup(code),info)
+        self.assertEqual(repr(icd.lookup("H601")),"CodeInfo('H60.1')")
+        self.assertRaises(AttributeError,setattr,icd.lookup("H601"),"name","H61")
+        self.assertRaises(ValueError,icd.lookup,"dinosaur")
+        self.assertIsNone(icd.try_lookup("dinosaur"))
+
+    def test_get_codes_with_prefix(self):
+        self.assertEqual(icd.get_codes_with_prefix("H60."),['H60.0', 'H60.1', 'H60.2', 'H60.3', 'H60.4', 'H60.5', 'H60.8', 'H60.9'])
+        self.assertEqual(icd.get_codes_with_prefix("H601"),['H60.1'])
+        self.assertEqual(icd.get_codes_with_prefix("H601",with_dots=False),['H601'])
+        self.assertEqual(icd.get_codes_with_prefix("dinosaur"),[])
+        for prefix in ["F0","C1","D","X8"]:
+            self.assertEqual(icd.get_codes_with_prefix(prefix),[code for code in icd.get_all_codes() if code.startswith(prefix) or icd.remove_dot(code).startswith(prefix)])
+
+    def test_get_codes_in_range(self):
+        self.assertEqual(list(icd.get_codes_in_range("A09","A09.9")),['A09', 'A09.0', 'A09.9'])
+        self.assertEqual(list(icd.get_codes_in_range("A09","A099",with_dots=False)),['A09', 'A090', 'A099'])
+        self.assertEqual(list(icd.get_codes_in_range("G10","G14")),icd.get_descendants("G10-G14"))
+        self.assertEqual(len(icd.get_codes_in_range("A00","A09.9")),len(icd.get_descendants("A00-A09")))
+        self.assertEqual(list(icd.get_codes_in_range("G14","G10")),[])
+        self.assertTrue("G11.2" in icd.get_codes_in_range("G10","G14"))
+        self.assertFalse("G15" in icd.get_codes_in_range("G10","G14"))
+        self.assertRaises(ValueError,icd.get_codes_in_range,"G10-G14","G14")
+        self.assertRaises(ValueError,icd.get_codes_in_range,"G10","dinosaur")
+
+    def test_suggest_codes(self):
+        self.assertEqual(icd.suggest_codes("j45,9"),[("J45.9",0)])
+        self.assertEqual(icd.suggest_codes("I 10"),[("I10",0)])
+        self.assertEqual(icd.suggest_codes("J45.O"),[("J45.0",0)])
+        self.assertEqual(icd.suggest_codes("024.4"),[("O24.4",0)])
+        self.assertEqual(icd.suggest_codes("I10X"),[("I10",0)])
+        self.assertEqual(icd.suggest_codes("xii"),[("XII",0)])
+        self.assertEqual(icd.suggest_codes("Z99.99"),[("Z99.9",1)])
+        self.assertEqual(icd.suggest_codes("Z99.99",max_distance=0),[])
+        self.assertEqual(icd.suggest_codes("J4509"),[("J45.0",1),("J45.9",1)])
+        self.assertEqual(icd.suggest_codes("J54.9"),[("A54.9",1),("C54.9",1),("G54.9",1),("H54.9",1),("J44.9",1)])
+        self.assertEqual(icd.suggest_codes("dinosaur",max_distance=2),[])
+        self.assertRaises(ValueError,icd.suggest_codes,"J45",3)
+        self.assertEqual(icd.suggest_codes("j45,9",max_results=0),[])
+        self.assertEqual(icd.suggest_codes("I10X",max_results=0),[])
+        self.assertEqual(icd.suggest_codes(float("nan")),[])
+        self.assertEqual(icd.suggest_codes(None),[])
+        self.assertEqual(icd.suggest_codes_batch(["I10",float("nan"),None]),[[("I10",0)],[],[]])
+        self.assertEqual(icd.suggest_codes_batch(["j45,9","Z99.99","j45,9"]),[[("J45.9",0)],[("Z99.9",1)],[("J45.9",0)]])
+
+    def test_search_descriptions(self):
+        self.assertEqual(icd.search_descriptions("Cholera")[:3],["A00","A00.0","A00.9"])
+        self.assertEqual(icd.search_descriptions("acute bronch",max_results=3),["J21","J21.9","J20"])
+        self.assertEqual(icd.search_descriptions("acute bronch",prefix_match=False),[])
+        self.assertEqual(sorted(icd.search_descriptions("asthma",within="J40-J47")),["J45","J45.0","J45.1","J45.8","J45.9","J46"])
+        self.assertEqual(icd.search_descriptions("asthma",within="C00"),[])
+        self.assertEqual(icd.search_descriptions("cellulitis external ear",max_results=1),["H60.1"])
+        self.assertEqual(icd.search_descriptions(""),[])
+        self.assertRaises(ValueError,icd.search_descriptions,"asthma",10,"dinosaur")
+
+    def test_get_subtree_totals(self):
+        codes = ["H60.1","H601","H60.2","C00","C00.1","dinosaur"]
+        totals = icd.get_subtree_totals(codes)
+        self.assertEqual(len(totals),len(icd.get_all_codes()))
+        for code, total in [("H60.1",2),("H60",3),("H60-H62",3),("VIII",3),("C00",2),("II",2),("H61",0),("I",0)]:
+            self.assertEqual(totals[icd.get_index(code)],total)
+        self.assertEqual(sum(icd.get_subtree_totals(codes,type="chapter")),5)
+        self.assertEqual(icd.get_subtree_totals(codes,type="block"),[totals[icd.get_index(code)] for code in icd.get_all_codes_view(type="block")])
+        weighted = icd.get_subtree_totals(codes,[1,2,4,8,16,32])
+        self.assertEqual(weighted[icd.get_index("H60")],7)
+        self.assertEqual(weighted[icd.get_index("C00")],24)
+        self.assertEqual(icd.get_subtree_totals({"H60.1":2.5,"H61":1.0})[icd.get_index("H60-H62")],3.5)
+        self.assertEqual(icd.get_subtree_totals([]),[0]*len(icd.get_all_codes()))
+        self.assertRaises(ValueError,icd.get_subtree_totals,codes,None,"dinosaur")
+        self.assertRaises(ValueError,icd.get_subtree_totals,codes,[1,2,3])
+        self.assertRaises(ValueError,icd.get_subtree_totals,codes[:2],[1,2,3])
+        self.assertEqual(icd.get_subtree_totals(codes,_ArrayLike([1,2,4,8,16,32])),weighted)
+
+    def test_get_similarity_matrix(self):
+        a_codes = ["H60.1","C00","VIII","H601"]
+        b_codes = ["H60.2","H61","C00.1","VIII","H60.1","C00-C14"]
+        self.assertEqual(icd.get_similarity_matrix(["H60.1"],["H60.2","H61","C00.1"],"path"),[[1/3,1/4,1/11]])
+        self.assertEqual(icd.get_similarity_matrix(["H60.1"],["H60.2","H61","C00.1","H601"]),[[0.75,4/7,0.0,1.0]])
+        for measure in ["path","wu_palmer","resnik"]:
+            matrix = icd.get_similarity_matrix(a_codes,b_codes,measure,["H60.1"]*10)
+            self.assertEqual(len(matrix),4)
+            self.assertEqual(matrix[0],matrix[3])
+            for i, a in enumerate(a_codes):
+                for j, b in enumerate(b_codes):
+                    self.assertEqual(matrix[i][j],icd.get_similarity_matrix([b],[a],measure,["H60.1"]*10)[0][0])
+            self.assertEqual([row for chunk in icd.iter_similarity_matrix(a_codes,b_codes,measure,["H60.1"]*10,chunk_size=3) for row in chunk],matrix)
+        resnik = icd.get_similarity_matrix(["H60.1"],["H60.2","H61","C00.1"],"resnik")[0]
+        self.assertTrue(resnik[0]>resnik[1]>resnik[2]==0.0)
+        corpus = ["H60.1","H60.2","C00.1","H60.1"]
+        self.assertEqual(icd.get_similarity_matrix(a_codes,b_codes,"resnik",_ArrayLike(corpus)),icd.get_similarity_matrix(a_codes,b_codes,"resnik",corpus))
+        self.assertEqual(icd.get_similarity_matrix([],b_codes),[])
+        self.assertEqual(list(icd.iter_similarity_matrix(a_codes,[])),[[[]]*4])
+        self.assertRaises(ValueError,icd.get_similarity_matrix,a_codes,["dinosaur"])
+        self.assertRaises(ValueError,icd.iter_similarity_matrix,a_codes,b_codes,"dinosaur")
+
+    def test_encode_multi_hot(self):
+        code_lists = [["H60.1","H601","H60.2"],[],["C00","dinosaur"],["VIII"]]
+        indptr, indices = icd.encode_multi_hot(code_lists)
+        self.assertEqual(list(indptr),[0,2,2,3,4])
+        self.assertEqual(list(indices),[icd.get_index("H60.1"),icd.get_index("H60.2"),icd.get_index("C00"),icd.get_index("VIII")])
+        indptr, indices = icd.encode_multi_hot(code_lists,ancestors=True)
+        self.assertEqual([icd.get_all_codes()[column] for column in indices[indptr[0]:indptr[1]]],["VIII","H60-H62","H60","H60.1","H60.2"])
+        self.assertEqual(list(indices[indptr[2]:indptr[3]]),sorted(icd.get_index(code) for code in ["C00"]+icd.get_ancestors("C00")))
+        indptr, indices = icd.encode_multi_hot(code_lists,max_depth=2)
+        self.assertEqual([icd.get_all_codes()[column] for column in indices[indptr[0]:indptr[1]]],["H60"])
+        indptr, indices = icd.encode_multi_hot(code_lists,ancestors=True,max_depth=0)
+        self.assertEqual([icd.get_all_codes()[column] for column in indices],["VIII","II","VIII"])
+        self.assertEqual(list(icd.encode_multi_hot([])[0]),[0])
+        self.assertRaises(ValueError,icd.encode_multi_hot,code_lists,False,-1)
+
+    def test_code_set(self):
+        code_set = icd.CodeSet(["I20-I25","IX","C00","E11.9"])
+        expected = set()
+        for code in ["I20-I25","IX","C00","E11.9"]:
+            expected.update([code]+icd.get_descendants(code))
+        self.assertEqual(set(code_set),expected)
+        self.assertEqual(list(code_set),[code for code in icd.get_all_codes() if code in expected])
+        self.assertEqual(len(code_set),len(expected))
+        self.assertTrue("I210" in code_set)
+        self.assertFalse("J00" in code_set)
+        self.assertFalse("dinosaur" in code_set)
+        self.assertEqual(list(icd.CodeSet(["C00"],descendants=False)),["C00"])
+        self.assertEqual(list(icd.CodeSet(["C00","J00"]) & icd.CodeSet(["C00.1","C00.2","H60"])),["C00.1","C00.2"])
+        self.assertEqual(list(icd.CodeSet(["C00"]) - icd.CodeSet(["C00.0","C00.1"],descendants=False)),["C00","C00.2","C00.3","C00.4","C00.5","C00.6","C00.8","C00.9"])
+        self.assertEqual(icd.CodeSet(["C00"]) | icd.CodeSet(["J00"]),icd.CodeSet(["J00","C00"]))
+        self.assertEqual(len(icd.CodeSet()),0)
+        codes = ["I210","I21.0","J00","dinosaur","IX","C00.1"]
+        self.assertEqual(code_set.contains_batch(codes),[code in code_set for code in codes])
+        self.assertEqual(icd.CodeSet.from_bytes(code_set.to_bytes()),code_set)
+        self.assertRaises(ValueError,icd.CodeSet.from_bytes,code_set.to_bytes()[:-1])
+        padded = bytearray(code_set.to_bytes())
+        padded[-1] |= 0x80
+        self.assertRaises(ValueError,icd.CodeSet.from_bytes,bytes(padded))
+        self.assertRaises(TypeError,lambda: code_set | 5)
+        self.assertRaises(TypeError,lambda: code_set & {"C00"})
+        self.assertRaises(TypeError,lambda: code_set - None)
+        self.assertRaises(ValueError,icd.CodeSet,["dinosaur"])
+
+    def test_cache(self):
+        icd.set_cache_size(2)
+        try:
+            self.assertEqual(icd.get_ancestors("H60.1"),('H60', 'H60-H62', 'VIII'))
+            self.assertEqual(icd.get_ancestors("H601"),('H60', 'H60-H62', 'VIII'))
+            self.assertEqual(icd.get_children("G10-G14"),('G10', 'G11', 'G12', 'G13', 'G14'))
+            self.assertEqual(icd.get_descendants("C00")[:2],('C00.0', 'C00.1'))
+            self.assertEqual(icd.get_nearest_common_ancestor("J950","J998"),"J95-J99")
+            self.assertEqual(icd.get_cache_info(),{"hits":1,"misses":4,"evictions":2,"size":2,"maxsize":2})
+            icd.clear_cache()
+            self.assertEqual(icd.get_cache_info(),{"hits":0,"misses":0,"evictions":0,"size":0,"maxsize":2})
+            self.assertRaises(ValueError,icd.set_cache_size,-1)
+        finally:
+            icd.set_cache_size(0)
+        self.assertEqual(icd.get_ancestors("H60.1"),['H60', 'H60-H62', 'VIII'])
+        self.assertEqual(icd.get_cache_info()["maxsize"],0)
+
+    def test_batch_functions(self):
+        codes = ["H601","dinosaur","G10-G14","H60.1","XII"]
+        self.assertEqual(icd.is_valid_item_batch(codes),[True,False,True,True,True])
+        self.assertEqual(icd.get_index_batch(codes),[icd.get_index("H60.1"),-1,icd.get_index("G10-G14"),icd.get_index("H60.1"),icd.get_index("XII")])
+        self.assertEqual(icd.add_dot_batch(codes),["H60.1","","G10-G14","H60.1","XII"])
+        self.assertEqual(icd.remove_dot_batch(codes),["H601","","G10-G14","H601","XII"])
+        self.assertEqual(icd.get_type_batch(codes),["subcategory","","block","subcategory","chapter"])
+        self.assertEqual(icd.get_description_batch(codes),["Cellulitis of external ear","","Systemic atrophies primarily affecting the central nervous system","Cellulitis of external ear","Diseases of the skin and subcutaneous tissue"])
+        self.assertEqual(icd.get_parent_batch(codes),["H60","","VI","H60",""])
+        self.assertEqual(icd.add_dot_batch(code for code in ["H601","H601"]),["H60.1","H60.1"])
+        self.assertEqual(icd.is_descendant_batch(codes,"H60-H62"),[True,False,False,True,False])
+        self.assertEqual(icd.is_descendant_batch(codes,"VIII"),[True,False,False,True,False])
+        self.assertEqual(icd.get_nearest_common_ancestor_batch(["J950","K35","H601","cat"],["J998","E21.0","H60","H60"]),["J95-J99","","H60",""])
+        self.assertEqual(icd.get_distance_batch(["J950","K35","H601","cat","H60.1"],["J998","E21.0","H60","H60","H601"]),[4,7,1,-1,0])
+        self.assertEqual(icd.get_distance_batch(["I","XII"],["II","XII"]),[2,0])
+        self.assertRaises(ValueError,icd.get_distance_batch,["A00","B00","C00"],["A00"])
+        self.assertRaises(ValueError,icd.get_nearest_common_ancestor_batch,["A00"],(code for code in ["A00","B00"]))
+
+    def test_pair_batch_functions_first(self):
+        #in a new interpreter, so that no other function has loaded the classification before
+        script = 'import simple_icd_10 as icd; print(icd.get_nearest_common_ancestor_batch(["J950"],["J998"]), icd.get_distance_batch(["J950"],["J998"]))'
+        result = subprocess.run([sys.executable, "-c", script], cwd=os.path.dirname(os.path.abspath(icd.__file__)), capture_output=True, text=True)
+        self.assertEqual(result.stdout.strip(),"['J95-J99'] [4]",result.stderr)
+
+    def test_annotate_rows(self):
+        rows = [["1","H601"],["2","dinosaur"],["3","G10-G14"],["4","XII"]]
+        self.assertEqual(list(icd.annotate_rows(rows,1,chunk_size=3)),[
+            ["1","H601",True,"H60.1","Cellulitis of external ear","VIII","H60-H62"],
+            ["2","dinosaur",False,"","","",""],
+            ["3","G10-G14",True,"G10-G14","Systemic atrophies primarily affecting the central nervous system","VI","G10-G14"],
+            ["4","XII",True,"XII","Diseases of the skin and subcutaneous tissue","XII",""]])
+        self.assertEqual(list(icd.annotate_rows([],0)),[])
+        self.assertEqual(list(icd.annotate_rows([["1","XII"],[],["2"]],1)),[["1","XII",True,"XII","Diseases of the skin and subcutaneous tissue","XII",""],[],["2"]])
+
+    def test_annotate_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            input_path = os.path.join(directory, "claims.csv")
+            with open(input_path, "w", newline="", encoding="utf-8") as file:
+                file.write('id;diagnosis;note\n1;H601;"two\nlines"\n2;dinosaur;\n'+"".join(str(i)+";C00;\n" for i in range(3,10)))
+            expected = ('id;diagnosis;note;diagnosis_valid;diagnosis_code;diagnosis_description;diagnosis_chapter;diagnosis_block\n'
+                        +'1;H601;"two\nlines";True;H60.1;Cellulitis of external ear;VIII;H60-H62\n2;dinosaur;;False;;;;\n'
+                        +"".join(str(i)+";C00;;True;C00;Malignant neoplasm of lip;II;C00-C14\n" for i in range(3,10)))
+            for processes in [1,2]:
+                output_path = os.path.join(directory, "annotated.csv")
+                self.assertEqual(icd.annotate_file(input_path,output_path,"diagnosis",delimiter=";",chunk_size=2,processes=processes),9)
+                with open(output_path, newline="", encoding="utf-8") as file:
+                    self.assertEqual(file.read(),expected)
+            self.assertRaises(ValueError,icd.annotate_file,input_path,output_path,"dinosaur",";")
+            #a blank line and a row without the column are copied unchanged
+            with open(input_path, "w", newline="", encoding="utf-8") as file:
+                file.write("id,code\n1,H601\n\n2\n3,A00\n")
+            self.assertEqual(icd.annotate_file(input_path,output_path,"code"),4)
+            with open(output_path, newline="", encoding="utf-8") as file:
+                self.assertEqual(file.read(),"id,code,code_valid,code_code,code_description,code_chapter,code_block\n1,H601,True,H60.1,Cellulitis of external ear,VIII,H60-H62\n\n2\n3,A00,True,A00,Cholera,I,A00-A09\n")
+
+    def test_annotate_codes_parallel(self):
+        codes = icd.get_all_codes()+icd.get_all_codes(False)+["dinosaur","","C0"]
+        expected = [icd._get_annotation(code) for code in codes]
+        self.assertEqual(icd.annotate_codes_parallel(codes,processes=2,chunk_size=10000),expected)
+        self.assertEqual(icd.annotate_codes_parallel(codes[:3]+codes[-3:],processes=1),expected[:3]+expected[-3:])
+        self.assertEqual(icd.annotate_codes_parallel([]),[])
+        reader = icd._FlatReader(icd._build_flat_image())
+        self.assertEqual(reader.find("H60.1"),reader.find("H601"))
+        self.assertEqual(reader.find("H60.1"),icd.get_index("H60.1"))
+        self.assertEqual(reader.find(None),-1)
+
+    def test_code_database(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "icd_10.bin")
+            icd.write_code_database(path)
+            with icd.CodeDatabase(path) as database:
+                for code in ["XII","L80-L99","H60","H60.1","H601","dinosaur",""]:
+                    for name in ["is_valid_item","is_chapter","is_block","is_category","is_subcategory","is_category_or_subcategory","is_chapter_or_block"]:
+                        self.assertEqual(getattr(database,name)(code),getattr(icd,name)(code))
+                for code in ["XII","L80-L99","H60","H60.1","H601"]:
+                    self.assertEqual(database.get_description(code),icd.get_description(code))
+                    self.assertEqual(database.get_parent(code),icd.get_parent(code))
+                    self.assertEqual(database.get_children(code),icd.get_children(code))
+                    self.assertEqual(database.is_leaf(code),icd.is_leaf(code))
+                self.assertRaises(ValueError,database.get_parent,"dinosaur")
+            with open(path, "r+b") as file:
+                file.truncate(100)
+            self.assertRaises(ValueError,icd.CodeDatabase,path)
+
+    def test_classification(self):
+        default = icd.Classification()
+        self.assertIs(icd.Classification(),default)
+        for code in ["XII","L80-L99","H60","H60.1","H601"]:
+            for name in ["is_valid_item","is_chapter","is_block","is_category","is_subcategory","get_description","get_parent","get_children","is_leaf","get_ancestors","get_descendants","get_index","remove_dot","add_dot"]:
+                self.assertEqual(getattr(default,name)(code),getattr(icd,name)(code))
+        self.assertEqual(default.get_nearest_common_ancestor("H60.1","H62"),"H60-H62")
+        self.assertTrue(default.is_ancestor("VIII","H601"))
+        self.assertTrue(default.is_descendant("H601","VIII"))
+        self.assertEqual(default.get_all_codes(False),icd.get_all_codes(False))
+        self.assertRaises(ValueError,default.get_parent,"dinosaur")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "icd_10_edited.xml")
+            with open(path, "wb") as file:
+                file.write(icd._read_data_file('icd_10_v2019.xml').replace(b"Cellulitis of external ear",b"Cellulitis of the external ear"))
+            edited = icd.Classification(path)
+            self.assertEqual(edited.get_description("H60.1"),"Cellulitis of the external ear")
+            self.assertEqual(icd.get_description("H60.1"),"Cellulitis of external ear")
+            self.assertEqual(edited.get_ancestors("H601"),icd.get_ancestors("H601"))
+            self.assertIs(edited.get_description("H60.0"),icd.get_description("H60.0"))
+            self.assertIsNot(icd.Classification(path),edited)
+            icd.set_cache_size(10)
+            try:
+                self.assertEqual(edited.get_children("H60"),default.get_children("H60"))
+                self.assertEqual(icd.get_cache_info()["misses"],2)
+            finally:
+                icd.set_cache_size(0)
+
+    def test_compare_editions(self):
+        #an edition where A00.9 is removed, A00.8 is added, A00 is moved to A15-A19 and H60.1 is described differently
+        root = ET.fromstring(icd._read_data_file('icd_10_v2019.xml'))
+        items = {item.find("name").text:item for item in root.iter("item")}
+        parents = {child:parent for parent in root.iter() for child in parent}
+        items["A00"].remove(items["A00.9"])
+        added = ET.SubElement(items["A00"], "item", type="subcategory")
+        ET.SubElement(added, "name").text = "A00.8"
+        ET.SubElement(added, "description").text = "Other cholera"
+        parents[items["A00"]].remove(items["A00"])
+        items["A15-A19"].append(items["A00"])
+        items["H60.1"].find("description").text = "Cellulitis of the external ear"
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "icd_10_edited.xml")
+            ET.ElementTree(root).write(path, encoding="utf-8")
+            old = icd.Classification()
+            new = icd.Classification(path)
+            self.assertEqual(icd.compare_editions(old,new),{"added":["A00.8"], "removed":["A00.9"], "moved":[("A00","A00-A09","A15-A19")], "redescribed":[("H60.1","Cellulitis of external ear","Cellulitis of the external ear")]})
+            self.assertEqual(icd.compare_editions(new,old)["added"],["A00.9"])
+            self.assertEqual(icd.translate_codes(["A00.9","A009","A00.1","H601","XII","dinosaur"],old,new),["A00","A00","A00.1","H60.1","XII",""])
+            self.assertEqual(icd.translate_codes(["A00.8","A00"],new,old),["A00","A00"])
+            self.assertEqual(icd.translate_codes([],old,new),[])
+            #the default edition is the same object on every call, so its table is built only once
+            table = icd._get_translation_table(new,icd.Classification())
+            self.assertEqual(icd.translate_codes(["A009","A00.8"],new,icd.Classification()),["","A00"])
+            self.assertEqual(icd.translate_codes(["A009","A00.8"],new,icd.Classification()),["","A00"])
+            self.assertIs(icd._get_translation_table(new,icd.Classification()),table)
+            self.assertLessEqual(len(icd._translation_tables),icd._TRANSLATION_TABLES_MAXSIZE)
+
+    def test_warmup(self):
+        icd.warmup()
+        self.assertIsNotNone(icd._search_index)
+        self.assertIsNotNone(icd._sorted_index)
+        self.assertIsNotNone(icd._correction_index)
+        self.assertIn((False,None),icd._multi_hot_columns)
+        self.assertTrue(icd.Classification()._loaded)
+        self.assertEqual(icd.search_descriptions("cholera",1),["A00"])
+
+    def test_concurrent_loading(self):
+        edition = icd.Classification(os.path.join(os.path.dirname(os.path.abspath(icd.__file__)), "data", "icd_10_v2019.xml"))
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(edition.get_all_codes(False))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results,[icd.get_all_codes(False)]*8)
+
+    def test_run_batch_async(self):
+        codes = ["H601","A00.1","dinosaur","XII"]*1000
+        self.assertEqual(asyncio.run(icd.run_batch_async(icd.add_dot_batch,codes,chunk_size=333)),icd.add_dot_batch(codes))
+        self.assertEqual(asyncio.run(icd.run_batch_async(icd.is_descendant_batch,codes,"VIII",chunk_size=3)),icd.is_descendant_batch(codes,"VIII"))
+        self.assertEqual(asyncio.run(icd.run_batch_async(icd.get_description_batch,[])),[])
+        for chunk_size in [0,-1]:
+            self.assertRaises(ValueError,asyncio.run,icd.run_batch_async(icd.add_dot_batch,codes,chunk_size=chunk_size))
+
+    def test_all(self):
+        namespace = {}
+        exec("from simple_icd_10 import *", namespace)
+        self.assertEqual(set(namespace)-{"__builtins__"},set(icd.__all__))
+        self.assertIn("get_description",namespace)
+        self.assertNotIn("os",namespace)
+
+    def test_binary_snapshot(self):
+        xml = icd._read_data_file('icd_10_v2019.xml')
+        self.assertEqual(icd._read_snapshot(xml), icd._flatten_xml(xml))
+        self.assertRaises(ValueError,icd._build_snapshot,xml.replace(b"Cellulitis of external ear",b"Cellulitis of\nexternal ear"))
+        #a snapshot whose strings don't split into a name and a description for each code is ignored
+        snapshot = icd._read_data_file('icd_10_v2019.bin')
+        read_data_file = icd._read_data_file
+        icd._read_data_file = lambda name: snapshot+b"\nextra"
+        try:
+            self.assertIsNone(icd._read_snapshot(xml))
+        finally:
+            icd._read_data_file = read_data_file